@@ -0,0 +1,223 @@
+# ==========================================================
+#   Window-size autotuner (cost model over field muls)
+# ==========================================================
+import time
+
+from formulas import field_muls
+from jacobian import (
+    jacobian_add, jacobian_mixed_add, jacobian_double, jacobian_double_repeated
+)
+from extended_jacobian import (
+    extended_add, extended_mixed_add, extended_double, extended_double_repeated,
+    to_extended
+)
+from xyzz import xyzz_add, xyzz_mixed_add, xyzz_double, xyzz_double_repeated, to_xyzz
+
+# Sample operands: secp256k1 base point G, and 2G / 4G in Jacobian form
+_Gx = 55066263022277343669578718895168534326250603453777594175500187360389116729240
+_Gy = 32670510020758816978083085130507043184471273380659243275938904335757337482424
+
+# A field inversion (pow(a, p-2, p)) counted as this many muls
+INV_COST_MULS = 270
+
+CANDIDATE_WINDOWS = range(1, 21)
+
+# m-fold doublings (shift_window*) are costed per doubling at this m
+REPEAT = 16
+
+# m-fold doublings: 7 field muls per doubling (jacobian.double_steps)
+# plus a per-call tail (extended: W = Z^2, XYZZ: ZZ / ZZZ scaling)
+_REPEATED_TAIL = {"double_repeated": 0, "ext_double_repeated": 1, "xyzz_double_repeated": 4}
+
+_op_costs = {}      # "muls" / "seconds" -> per-operation cost table
+_window_cache = {}  # (engine, n bucket, bits, signed, unit) -> w
+
+
+# ------------------------------------------------------------
+# Per-operation costs
+# ------------------------------------------------------------
+
+def _sample_operands():
+    G = (_Gx, _Gy)
+    G2 = jacobian_double((_Gx, _Gy, 1))
+    G4 = jacobian_double(G2)
+    return G, G2, G4
+
+
+def _op_table():
+    G, G2, G4 = _sample_operands()
+    E2 = extended_double(to_extended(G))
+    E4 = extended_double(E2)
+    Z2 = xyzz_double(to_xyzz(G))
+    Z4 = xyzz_double(Z2)
+    return {
+        "mixed_add": lambda: jacobian_mixed_add(G4, G),
+        "add": lambda: jacobian_add(G4, G2),
+        "double": lambda: jacobian_double(G4),
+        "ext_mixed_add": lambda: extended_mixed_add(E4, G),
+        "ext_add": lambda: extended_add(E4, E2),
+        "ext_double": lambda: extended_double(E4),
+        "xyzz_mixed_add": lambda: xyzz_mixed_add(Z4, G),
+        "xyzz_add": lambda: xyzz_add(Z4, Z2),
+        "xyzz_double": lambda: xyzz_double(Z4),
+        "double_repeated": lambda: jacobian_double_repeated(G4, REPEAT),
+        "ext_double_repeated": lambda: extended_double_repeated(E4, REPEAT),
+        "xyzz_double_repeated": lambda: xyzz_double_repeated(Z4, REPEAT),
+    }
+
+
+# Cost-table entry -> formula in formulas.py
+_OP_FORMULAS = {
+    "mixed_add": "jacobian_mixed_add",
+    "add": "jacobian_add",
+    "double": "jacobian_double",
+    "ext_mixed_add": "extended_mixed_add",
+    "ext_add": "extended_add",
+    "ext_double": "extended_double",
+    "xyzz_mixed_add": "xyzz_mixed_add",
+    "xyzz_add": "xyzz_add",
+    "xyzz_double": "xyzz_double",
+}
+
+
+def measure_op_costs():
+    """
+    Field muls (mul + sqr; small-constant muls are not counted) per
+    point operation, taken from the static counts of the compiled
+    formulas.
+    """
+    if "muls" in _op_costs:
+        return _op_costs["muls"]
+
+    costs = {name: field_muls(formula) for name, formula in _OP_FORMULAS.items()}
+    for name, tail in _REPEATED_TAIL.items():
+        costs[name] = 7 + tail / REPEAT
+
+    # Batch-affine add: 3 muls of Montgomery's trick + 3 for the slope
+    costs["batch_affine_add"] = 6
+    costs["inv"] = INV_COST_MULS
+
+    _op_costs["muls"] = costs
+    return costs
+
+
+def calibrate_op_costs(repeats=200):
+    """
+    Same table as measure_op_costs, in seconds per operation,
+    from short timed runs (includes interpreter overhead).
+    """
+    if "seconds" in _op_costs:
+        return _op_costs["seconds"]
+
+    costs = {}
+    for name, op in _op_table().items():
+        start = time.perf_counter()
+        for _ in range(repeats):
+            op()
+        costs[name] = (time.perf_counter() - start) / repeats
+    for name in _REPEATED_TAIL:
+        costs[name] /= REPEAT
+
+    muls = measure_op_costs()
+    sec_per_mul = costs["mixed_add"] / muls["mixed_add"]
+    costs["batch_affine_add"] = muls["batch_affine_add"] * sec_per_mul
+    costs["inv"] = muls["inv"] * sec_per_mul
+
+    _op_costs["seconds"] = costs
+    return costs
+
+
+# ------------------------------------------------------------
+# Cost model
+# ------------------------------------------------------------
+
+def estimate_cost(engine, n, bits, w, signed=False, costs=None):
+    """
+    Estimated total cost of one MSM (in the units of `costs`,
+    field muls by default) for n terms of `bits`-bit scalars.
+    """
+    if costs is None:
+        costs = measure_op_costs()
+
+    num_windows = (bits + w - 1) // w
+    if signed:
+        num_windows += 1
+        num_buckets = (1 << (w - 1)) + 1
+    else:
+        num_buckets = 1 << w
+
+    # Non-zero digits per window, and buckets they are expected to fill
+    used = num_buckets - 1
+    hits = n * (1 - 1 / (1 << w))
+    occupied = used * (1 - (1 - 1 / used) ** hits)
+    adds = max(0.0, hits - occupied)
+
+    shifts = (num_windows - 1) * w
+
+    # Running sum: one add per occupied bucket, and `result += running`
+    # from the highest occupied bucket down (adds with INF are free)
+    top = used * occupied / (occupied + 1)
+    reduce_adds = occupied + top
+
+    if engine == "pippenger":
+        per_window = adds * costs["mixed_add"] + reduce_adds * costs["add"]
+        total = num_windows * (per_window + costs["add"]) + shifts * costs["double_repeated"]
+
+    elif engine == "extended":
+        per_window = adds * costs["ext_mixed_add"] + reduce_adds * costs["ext_add"]
+        total = (num_windows * (per_window + costs["ext_add"])
+                 + shifts * costs["ext_double_repeated"])
+
+    elif engine == "xyzz":
+        per_window = adds * costs["xyzz_mixed_add"] + reduce_adds * costs["xyzz_add"]
+        total = (num_windows * (per_window + costs["xyzz_add"])
+                 + shifts * costs["xyzz_double_repeated"])
+
+    elif engine == "batch_affine":
+        # ceil(log2(largest bucket)) rounds, one inversion each
+        per_bucket = max(1.0, hits / used)
+        rounds = max(1, (int(2 * per_bucket) - 1).bit_length())
+        per_window = (
+            adds * costs["batch_affine_add"]
+            + rounds * costs["inv"]
+            + occupied * costs["mixed_add"]
+            + top * costs["add"]
+        )
+        total = num_windows * (per_window + costs["add"]) + shifts * costs["double_repeated"]
+
+    else:
+        raise ValueError(f"unknown engine: {engine}")
+
+    return total
+
+
+def choose_window(engine, n, bits=256, signed=False, calibrate=False,
+                  candidates=CANDIDATE_WINDOWS):
+    """
+    Window size with the lowest estimated cost.
+    calibrate=True weighs operations by measured time instead of
+    field muls. Results are cached per (engine, N bucket, bits).
+    """
+    unit = "seconds" if calibrate else "muls"
+    key = (engine, max(1, n).bit_length(), bits, signed, unit)
+    if key in _window_cache:
+        return _window_cache[key]
+
+    costs = calibrate_op_costs() if calibrate else measure_op_costs()
+
+    # Representative N of the bucket: its upper bound
+    n_rep = (1 << key[1]) - 1
+    bits = max(1, bits)
+
+    best = min(
+        candidates,
+        key=lambda w: estimate_cost(engine, n_rep, bits, w, signed, costs),
+    )
+
+    _window_cache[key] = best
+    return best
+
+
+def clear_cache():
+    _window_cache.clear()
+    _op_costs.clear()
@@ -0,0 +1,395 @@
+# ==========================================================
+#   Benchmark sweep over N, w, scalar bit-length and engine
+# ==========================================================
+#
+#   python bench.py --quick
+#   python bench.py --n 100,1000,10000 --w 8,12,auto --bits 128,256 \
+#                   --engines pippenger,extended --json out.json
+#   python bench.py --quick --baseline out.json --threshold 0.10
+#
+# For every configuration the MSM is timed `--repeat` times (best
+# time kept, no instrumentation), then run once more under the
+# profiler and tracemalloc for field-mul / inversion counts and the
+# peak Python heap. The "parallel" engine does its point work in
+# child processes: its peak heap is the parent's only and it has no
+# field-mul / inversion counts (null, skipped by the baseline
+# comparison). Results go to JSON and / or CSV.
+#
+# With --baseline, every configuration also present in the baseline
+# file is compared: more than `threshold` slower, or more field muls,
+# is a regression and the run exits with status 1.
+
+import argparse
+import csv
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import op_counter
+from profiler import profile
+from fixtures import fixture
+from autotune import choose_window
+from msm_naive import msm_naive
+from msm_reference import msm_reference
+from msm_pippenger import msm_pippenger
+from msm_extended import msm_extended
+from msm_xyzz import msm_xyzz
+from msm_batch_affine import msm_batch_affine
+from msm_fixed_base import PreparedBases, msm_fixed_base
+from msm_streaming import msm_stream
+from msm_incremental import IncrementalMSM
+from msm_parallel import msm_pippenger_parallel
+
+try:
+    from msm_numpy import msm_numpy
+except ImportError:  # NumPy not installed
+    msm_numpy = None
+
+FIELDS = ["engine", "n", "w", "bits", "time_s", "field_muls", "field_invs", "peak_bytes"]
+
+
+# ------------------------------------------------------------
+# Engines
+# ------------------------------------------------------------
+#
+# setup(scalars, points, w) -> zero-argument callable running one
+# MSM. Work that the engine expects to be done ahead of time (fixed-
+# base tables) happens in setup and is not timed.
+#
+#   model : autotune cost model used to resolve w = "auto"
+#   max_n : largest N run by default (naive / reference are O(N*bits)
+#           and O(N + 4^w) point ops)
+#   max_w : largest window (reference reduces with i repeated adds)
+#   counts: False if the field ops happen outside this process
+#           (default True)
+
+def _setup_fixed_base(scalars, points, w):
+    prepared = PreparedBases(points, w, bits=max(1, max(scalars).bit_length()))
+    return lambda: msm_fixed_base(scalars, prepared)
+
+
+def _setup_streaming(scalars, points, w):
+    bits = max(1, max(scalars).bit_length())
+    return lambda: msm_stream(zip(scalars, points), w, bits=bits)
+
+
+INCREMENTAL_UPDATES = 16
+
+
+def _setup_incremental(scalars, points, w):
+    """
+    The state is built in setup; one run is INCREMENTAL_UPDATES
+    scalar updates followed by result(). Pass p over the indices
+    sets scalar i to scalars[i + 1 + p], so every update changes it.
+    """
+    msm = IncrementalMSM(scalars, points, w)
+    n = len(scalars)
+    steps = itertools.count()
+
+    def run():
+        for _ in range(INCREMENTAL_UPDATES):
+            k = next(steps)
+            msm.update(k % n, scalars[(k + 1 + k // n) % n])
+        return msm.result()
+
+    return run
+
+
+ENGINES = {
+    "naive": dict(
+        setup=lambda s, p, w: lambda: msm_naive(s, p),
+        model=None, max_n=1000, max_w=None,
+    ),
+    "reference": dict(
+        setup=lambda s, p, w: lambda: msm_reference(s, p, w),
+        model="pippenger", max_n=1000, max_w=8,
+    ),
+    "pippenger": dict(
+        setup=lambda s, p, w: lambda: msm_pippenger(s, p, w),
+        model="pippenger", max_n=None, max_w=None,
+    ),
+    "pippenger_signed": dict(
+        setup=lambda s, p, w: lambda: msm_pippenger(s, p, w, signed=True),
+        model="pippenger", max_n=None, max_w=None,
+    ),
+    "pippenger_glv": dict(
+        setup=lambda s, p, w: lambda: msm_pippenger(s, p, w, glv=True),
+        model="pippenger", max_n=None, max_w=None,
+    ),
+    "pippenger_store": dict(
+        setup=lambda s, p, w: lambda: msm_pippenger(s, p, w, bucket_store=True),
+        model="pippenger", max_n=None, max_w=None,
+    ),
+    "extended": dict(
+        setup=lambda s, p, w: lambda: msm_extended(s, p, w),
+        model="extended", max_n=None, max_w=None,
+    ),
+    "extended_signed": dict(
+        setup=lambda s, p, w: lambda: msm_extended(s, p, w, signed=True),
+        model="extended", max_n=None, max_w=None,
+    ),
+    "xyzz": dict(
+        setup=lambda s, p, w: lambda: msm_xyzz(s, p, w),
+        model="xyzz", max_n=None, max_w=None,
+    ),
+    "batch_affine": dict(
+        setup=lambda s, p, w: lambda: msm_batch_affine(s, p, w),
+        model="batch_affine", max_n=None, max_w=None,
+    ),
+    "numpy": dict(
+        setup=lambda s, p, w: lambda: msm_numpy(s, p, w),
+        model="pippenger", max_n=None, max_w=None,
+    ),
+    "parallel": dict(
+        setup=lambda s, p, w: lambda: msm_pippenger_parallel(s, p, w),
+        model="pippenger", max_n=None, max_w=None, counts=False,
+    ),
+    "fixed_base": dict(
+        setup=_setup_fixed_base,
+        model="pippenger", max_n=None, max_w=None,
+    ),
+    "streaming": dict(
+        setup=_setup_streaming,
+        model="pippenger", max_n=None, max_w=None,
+    ),
+    "incremental": dict(
+        setup=_setup_incremental,
+        model="pippenger", max_n=None, max_w=None,
+    ),
+}
+
+if msm_numpy is None:
+    del ENGINES["numpy"]
+
+
+# ------------------------------------------------------------
+# One configuration
+# ------------------------------------------------------------
+
+def run_one(engine, scalars, points, w, bits, repeat=3):
+    spec = ENGINES[engine]
+    n = len(scalars)
+
+    if spec["model"] is None:
+        w = None
+    elif w == "auto":
+        w = choose_window(spec["model"], n, bits)
+
+    run = spec["setup"](scalars, points, w)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    # Counts and peak heap from one instrumented run
+    saved = dict(vars(op_counter))
+    op_counter.reset_counters()
+    tracemalloc.start()
+    try:
+        with profile():
+            run()
+        _, peak = tracemalloc.get_traced_memory()
+        muls = op_counter.field_mul_count
+        invs = op_counter.field_inv_count
+        if not spec.get("counts", True):
+            muls = invs = None
+    finally:
+        tracemalloc.stop()
+        for key, value in saved.items():
+            if key.endswith("_count"):
+                setattr(op_counter, key, value)
+
+    return {
+        "engine": engine,
+        "n": n,
+        "w": w,
+        "bits": bits,
+        "time_s": best,
+        "field_muls": muls,
+        "field_invs": invs,
+        "peak_bytes": peak,
+    }
+
+
+# ------------------------------------------------------------
+# Sweep
+# ------------------------------------------------------------
+
+def sweep(ns, ws, bit_lengths, engines, repeat=3, seed=1, budget=60.0,
+          all_sizes=False, cache=True, log=print):
+    """
+    Run every (engine, bits, w, N) combination, N ascending.
+    Once an engine's time at some N, scaled linearly, would exceed
+    `budget` seconds at the next N, the larger N are skipped for
+    that (engine, bits, w). Inputs come from fixtures.fixture.
+    """
+    ns = sorted(ns)
+    results = []
+
+    for bits in bit_lengths:
+        inputs = {n: fixture(n, bits, seed, cache) for n in ns}
+
+        for engine in engines:
+            spec = ENGINES[engine]
+            engine_ws = [None] if spec["model"] is None else ws
+
+            for w in engine_ws:
+                if spec["max_w"] and w != "auto" and w > spec["max_w"]:
+                    log(f"skip {engine} w={w}: above max_w={spec['max_w']}")
+                    continue
+
+                last = None
+                for n in ns:
+                    if not all_sizes and spec["max_n"] and n > spec["max_n"]:
+                        log(f"skip {engine} n={n}: above max_n={spec['max_n']}")
+                        break
+                    if last and budget and last["time_s"] * n / last["n"] > budget:
+                        log(f"skip {engine} w={w} bits={bits} n>={n}: over budget")
+                        break
+
+                    scalars, points = inputs[n]
+                    row = run_one(engine, scalars, points, w, bits, repeat)
+                    muls = "-" if row["field_muls"] is None else row["field_muls"]
+                    log(
+                        f"{engine:<17} n={n:<8} w={str(row['w']):<4} bits={bits:<4} "
+                        f"{row['time_s']:>9.4f} s  {muls:>11} muls  "
+                        f"{row['peak_bytes'] / 1e6:>8.2f} MB"
+                    )
+                    results.append(row)
+                    last = row
+
+    return results
+
+
+# ------------------------------------------------------------
+# Output / baseline
+# ------------------------------------------------------------
+
+def write_json(path, results):
+    meta = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=1)
+
+
+def write_csv(path, results):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in results:
+            writer.writerow({key: row[key] for key in FIELDS})
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def _key(row):
+    return (row["engine"], row["n"], row["w"], row["bits"])
+
+
+def compare(results, baseline, threshold=0.10):
+    """
+    Regressions against a baseline result list:
+        [(row, base, reason), ...]
+    """
+    base_by_key = {_key(row): row for row in baseline}
+    regressions = []
+
+    for row in results:
+        base = base_by_key.get(_key(row))
+        if base is None:
+            continue
+        if row["time_s"] > base["time_s"] * (1 + threshold):
+            ratio = row["time_s"] / base["time_s"]
+            regressions.append((row, base, f"time x{ratio:.2f}"))
+        if row["field_muls"] is None or base["field_muls"] is None:
+            continue
+        if row["field_muls"] > base["field_muls"]:
+            regressions.append(
+                (row, base, f"field muls {base['field_muls']} -> {row['field_muls']}")
+            )
+
+    return regressions
+
+
+# ------------------------------------------------------------
+# Command line
+# ------------------------------------------------------------
+
+def _int_list(text):
+    return [int(float(x)) for x in text.split(",")]
+
+
+def _w_list(text):
+    return [x if x == "auto" else int(x) for x in text.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MSM benchmark sweep")
+    parser.add_argument("--n", type=_int_list, default=[10 ** k for k in range(2, 7)],
+                        help="comma separated N values (default 1e2..1e6)")
+    parser.add_argument("--w", type=_w_list, default=[8, 12, 16],
+                        help="comma separated window sizes, 'auto' = autotuner")
+    parser.add_argument("--bits", type=_int_list, default=[64, 128, 256],
+                        help="comma separated scalar bit-lengths")
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help="comma separated engines: " + ", ".join(ENGINES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--budget", type=float, default=60.0,
+                        help="skip larger N once a run would exceed this many seconds")
+    parser.add_argument("--all-sizes", action="store_true",
+                        help="ignore the per-engine max_n limits")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="regenerate inputs instead of using the fixture cache")
+    parser.add_argument("--quick", action="store_true",
+                        help="small sweep: N=100,1000  w=8  bits=256")
+    parser.add_argument("--json", help="write results to this JSON file")
+    parser.add_argument("--csv", help="write results to this CSV file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown vs the baseline (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.n, args.w, args.bits = [100, 1000], [8], [256]
+
+    engines = args.engines.split(",")
+    for engine in engines:
+        if engine not in ENGINES:
+            parser.error(f"unknown engine: {engine}")
+
+    results = sweep(args.n, args.w, args.bits, engines, args.repeat, args.seed,
+                    args.budget, args.all_sizes, not args.no_cache)
+
+    if args.json:
+        write_json(args.json, results)
+    if args.csv:
+        write_csv(args.csv, results)
+
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.threshold)
+        for row, base, reason in regressions:
+            print(
+                f"REGRESSION {row['engine']} n={row['n']} w={row['w']} "
+                f"bits={row['bits']}: {reason}"
+            )
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+import threading
+
+from field import f_sub, f_mul, f_neg, f_eq, INF
+from jacobian import jacobian_add, jacobian_double
+from extended_jacobian import extended_add, extended_double, EXT_INF
+
+# Coordinates per bucket
+FORMS = {"jacobian": 3, "extended_jacobian": 4}
+
+
+# ------------------------------------------------------------
+# Array-backed bucket storage
+# ------------------------------------------------------------
+
+class BucketStore:
+    """
+    Buckets kept in preallocated flat arrays, one per coordinate
+    (X, Y, Z and W for extended_jacobian), plus an `occupied` bitmap.
+
+    Mixed additions update the arrays in place, so no bucket list
+    or coordinate tuple is created per window. clear() only resets
+    the buckets that were touched, so one store is reused across
+    windows and across MSM calls in the same thread (see
+    get_bucket_store).
+    """
+
+    def __init__(self, num_buckets, form="jacobian"):
+        self.num_buckets = num_buckets
+        self.form = form
+        self.coords = FORMS[form]
+
+        self.X = [0] * num_buckets
+        self.Y = [0] * num_buckets
+        self.Z = [0] * num_buckets
+        self.W = [0] * num_buckets if self.coords == 4 else None
+
+        self.occupied = bytearray(num_buckets)
+        self._touched = []
+
+    def clear(self):
+        occupied = self.occupied
+        for b in self._touched:
+            occupied[b] = 0
+        self._touched.clear()
+
+    def get(self, b):
+        """Bucket b as a point tuple (INF / EXT_INF if empty)."""
+        if self.coords == 4:
+            if not self.occupied[b]:
+                return EXT_INF
+            return (self.X[b], self.Y[b], self.Z[b], self.W[b])
+
+        if not self.occupied[b]:
+            return INF
+        return (self.X[b], self.Y[b], self.Z[b])
+
+    def _set(self, b, P):
+        """Store a tuple result of the generic formulas (rare path)."""
+        if P[2] == 0:
+            self.occupied[b] = 0
+            return
+        self.X[b], self.Y[b], self.Z[b] = P[0], P[1], P[2]
+        if self.coords == 4:
+            self.W[b] = P[3]
+
+    # --------------------------------------------------------
+    # bucket[b] += (x2, y2)
+    # --------------------------------------------------------
+
+    def add_affine(self, b, x2, y2):
+        if not self.occupied[b]:
+            self.occupied[b] = 1
+            self._touched.append(b)
+            self.X[b] = x2
+            self.Y[b] = y2
+            self.Z[b] = 1
+            if self.coords == 4:
+                self.W[b] = 1
+            return
+
+        if self.coords == 4:
+            self._extended_mixed_add(b, x2, y2)
+        else:
+            self._jacobian_mixed_add(b, x2, y2)
+
+    def _jacobian_mixed_add(self, b, x2, y2):
+        # Same formula as jacobian_mixed_add, written back in place
+        X1 = self.X[b]
+        Y1 = self.Y[b]
+        Z1 = self.Z[b]
+
+        Z1_sq = f_mul(Z1, Z1)
+        U2 = f_mul(x2, Z1_sq)
+        S2 = f_mul(y2, f_mul(Z1_sq, Z1))
+
+        if f_eq(U2, X1):
+            # P + P or P + (-P)
+            if f_eq(S2, Y1):
+                self._set(b, jacobian_double((X1, Y1, Z1)))
+            else:
+                self.occupied[b] = 0
+            return
+
+        H = f_sub(U2, X1)
+        R = f_sub(S2, Y1)
+        H_sq = f_mul(H, H)
+        H_cu = f_mul(H_sq, H)
+        X1_H_sq = f_mul(X1, H_sq)
+
+        X3 = f_sub(f_sub(f_mul(R, R), H_cu), f_mul(2, X1_H_sq))
+        self.Y[b] = f_sub(f_mul(R, f_sub(X1_H_sq, X3)), f_mul(Y1, H_cu))
+        self.X[b] = X3
+        self.Z[b] = f_mul(Z1, H)
+
+    def _extended_mixed_add(self, b, x2, y2):
+        # Same formula as extended_mixed_add, written back in place
+        X1 = self.X[b]
+        Y1 = self.Y[b]
+        Z1 = self.Z[b]
+        W1 = self.W[b]
+
+        U2 = f_mul(x2, W1)
+        S2 = f_mul(y2, f_mul(Z1, W1))
+
+        if f_eq(U2, X1):
+            # P + P or P + (-P)
+            if f_eq(S2, Y1):
+                self._set(b, extended_double((X1, Y1, Z1, W1)))
+            else:
+                self.occupied[b] = 0
+            return
+
+        H = f_sub(U2, X1)
+        R = f_sub(S2, Y1)
+        H_sq = f_mul(H, H)
+        H_cu = f_mul(H_sq, H)
+        X1_H_sq = f_mul(X1, H_sq)
+
+        X3 = f_sub(f_sub(f_mul(R, R), H_cu), f_mul(2, X1_H_sq))
+        self.Y[b] = f_sub(f_mul(R, f_sub(X1_H_sq, X3)), f_mul(Y1, H_cu))
+        self.X[b] = X3
+        Z3 = f_mul(Z1, H)
+        self.Z[b] = Z3
+        self.W[b] = f_mul(Z3, Z3)
+
+
+# One cache per thread: a store is mutated in place for a whole
+# window, so MSMs running concurrently in different threads (service
+# executor, sharded worker threads) must never share one.
+_local = threading.local()
+
+
+def get_bucket_store(num_buckets, form="jacobian"):
+    """
+    Cleared store of the given size, shared across windows and calls
+    of the calling thread.
+    """
+    stores = getattr(_local, "stores", None)
+    if stores is None:
+        stores = _local.stores = {}
+
+    key = (num_buckets, form)
+    store = stores.get(key)
+    if store is None:
+        store = stores[key] = BucketStore(num_buckets, form)
+    else:
+        store.clear()
+    return store
+
+
+# ------------------------------------------------------------
+# Build / reduce on a store
+# ------------------------------------------------------------
+
+def build_buckets_store(window_values, points, store, signed=False):
+    """
+    bucket[i] += every point whose window value == i (in place).
+    Negative signed digits add -P into bucket[-i].
+    """
+    store.clear()
+    add_affine = store.add_affine
+
+    for idx, b in enumerate(window_values):
+        if b == 0:
+            continue
+
+        x, y = points[idx]
+        if b < 0:
+            b = -b
+            y = f_neg(y)
+
+        add_affine(b, x, y)
+
+    return store
+
+
+def reduce_buckets_store(store):
+    """
+    Pippenger running-sum reduction over the occupied bitmap:
+        running += bucket[i];  result += running
+    """
+    if store.coords == 4:
+        add, running, result = extended_add, EXT_INF, EXT_INF
+    else:
+        add, running, result = jacobian_add, INF, INF
+
+    occupied = store.occupied
+    for i in range(store.num_buckets - 1, 0, -1):
+        if occupied[i]:
+            running = add(running, store.get(i))
+        result = add(result, running)
+
+    return result
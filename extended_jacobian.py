@@ -1,5 +1,5 @@
-from field import f_add, f_sub, f_mul, f_inv, p
-import op_counter  # <--- חשוב מאוד לייבא את המונים
+from field import f_add, f_sub, f_mul, f_inv, f_eq, f_norm, p
+from jacobian import double_steps
 
 EXT_INF = (1, 1, 0, 0)
 
@@ -16,7 +16,7 @@ def extended_to_affine(P):
     Z_inv = f_inv(Z)
     Z_inv_sq = f_mul(Z_inv, Z_inv)
     Z_inv_cu = f_mul(Z_inv_sq, Z_inv)
-    return (f_mul(X, Z_inv_sq), f_mul(Y, Z_inv_cu))
+    return (f_norm(f_mul(X, Z_inv_sq)), f_norm(f_mul(Y, Z_inv_cu)))
 
 
 # ----------------------------------------------------------
@@ -24,9 +24,6 @@ def extended_to_affine(P):
 # ----------------------------------------------------------
 
 def extended_double(P):
-    # הנה התיקון: השורה הזו כבר לא בהערה!
-    op_counter.extended_double_count += 1
-
     X1, Y1, Z1, W1 = P
 
     if Z1 == 0:
@@ -49,10 +46,28 @@ def extended_double(P):
     return (X3, Y3, Z3, W3)
 
 
-def extended_mixed_add(P, Q_aff):
-    # הנה התיקון:
-    op_counter.extended_mixed_add_count += 1
+def extended_double_repeated(P, m):
+    """
+    2^m * P, same result as m extended_double calls.
+    Runs jacobian.double_steps, so W = Z^2 is computed once at the
+    end: 3M + 4S per doubling + 1S + 1 small-constant mul.
+    """
+    X1, Y1, Z1, W1 = P
+
+    if m == 0:
+        return P
+    if Z1 == 0:
+        return EXT_INF
+
+    X3, Y3, Z3 = double_steps(X1, Y1, f_mul(Z1, pow(2, m, p)), m)
 
+    if f_eq(Z3, 0):
+        return EXT_INF
+
+    return (X3, Y3, Z3, f_mul(Z3, Z3))
+
+
+def extended_mixed_add(P, Q_aff):
     X1, Y1, Z1, W1 = P
     x2, y2 = Q_aff
 
@@ -62,8 +77,8 @@ def extended_mixed_add(P, Q_aff):
     U2 = f_mul(x2, W1)
     S2 = f_mul(y2, f_mul(Z1, W1))
 
-    if U2 == X1:
-        if S2 != Y1:
+    if f_eq(U2, X1):
+        if not f_eq(S2, Y1):
             return EXT_INF
         return extended_double(P)
 
@@ -71,9 +86,10 @@ def extended_mixed_add(P, Q_aff):
     R = f_sub(S2, Y1)
     H_sq = f_mul(H, H)
     H_cu = f_mul(H_sq, H)
+    V = f_mul(X1, H_sq)
 
-    X3 = f_sub(f_sub(f_mul(R, R), H_cu), f_mul(2, f_mul(X1, H_sq)))
-    Y3 = f_sub(f_mul(R, f_sub(f_mul(X1, H_sq), X3)), f_mul(Y1, H_cu))
+    X3 = f_sub(f_sub(f_mul(R, R), H_cu), f_mul(2, V))
+    Y3 = f_sub(f_mul(R, f_sub(V, X3)), f_mul(Y1, H_cu))
     Z3 = f_mul(Z1, H)
     W3 = f_mul(Z3, Z3)
 
@@ -81,9 +97,6 @@ def extended_mixed_add(P, Q_aff):
 
 
 def extended_add(P, Q):
-    # הנה התיקון:
-    op_counter.extended_add_count += 1
-
     X1, Y1, Z1, W1 = P
     X2, Y2, Z2, W2 = Q
 
@@ -95,18 +108,19 @@ def extended_add(P, Q):
     S1 = f_mul(Y1, f_mul(Z2, W2))
     S2 = f_mul(Y2, f_mul(Z1, W1))
 
-    if U1 == U2:
-        if S1 != S2: return EXT_INF
+    if f_eq(U1, U2):
+        if not f_eq(S1, S2): return EXT_INF
         return extended_double(P)
 
     H = f_sub(U2, U1)
     R = f_sub(S2, S1)
     H_sq = f_mul(H, H)
     H_cu = f_mul(H_sq, H)
+    V = f_mul(U1, H_sq)
 
-    X3 = f_sub(f_sub(f_mul(R, R), H_cu), f_mul(2, f_mul(U1, H_sq)))
-    Y3 = f_sub(f_mul(R, f_sub(f_mul(U1, H_sq), X3)), f_mul(S1, H_cu))
+    X3 = f_sub(f_sub(f_mul(R, R), H_cu), f_mul(2, V))
+    Y3 = f_sub(f_mul(R, f_sub(V, X3)), f_mul(S1, H_cu))
     Z3 = f_mul(f_mul(Z1, Z2), H)
     W3 = f_mul(Z3, Z3)
 
-    return (X3, Y3, Z3, W3)
\ No newline at end of file
+    return (X3, Y3, Z3, W3)
\ No newline at end of file
@@ -2,9 +2,15 @@
 #   Field arithmetic for secp256k1  (GF(p))
 #   Clean version for ASIC reference model
 # ==========================================================
-import op_counter
+import sys
+
 p = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
 
+# p = 2^256 - C  ->  2^256 == C (mod p)
+_C = (1 << 32) + 977
+_MASK256 = (1 << 256) - 1
+_P4 = 4 * p
+
 # ------------- Field operations -------------
 
 def f_add(a, b):
@@ -14,14 +20,146 @@ def f_sub(a, b):
     return (a - b) % p
 
 def f_mul(a, b):
-    op_counter.field_mul_count += 1
     return (a * b) % p
 
+def f_eq(a, b):
+    return a == b
+
+def f_norm(a):
+    return a
+
 def f_inv(a):
     return pow(a, p - 2, p)
 
+def f_batch_inv(values):
+    """
+    Montgomery's trick: invert every element of `values` with a
+    single f_inv and 3*(n-1) multiplications.
+    All values must be non-zero.
+    """
+    n = len(values)
+    if n == 0:
+        return []
+
+    # prefix[i] = values[0] * ... * values[i]
+    prefix = [values[0]] * n
+    for i in range(1, n):
+        prefix[i] = f_mul(prefix[i - 1], values[i])
+
+    inv = f_inv(prefix[n - 1])
+
+    out = [0] * n
+    for i in range(n - 1, 0, -1):
+        out[i] = f_mul(inv, prefix[i - 1])
+        inv = f_mul(inv, values[i])
+    out[0] = inv
+
+    return out
+
 def f_neg(a):
     return (-a) % p
 
+
+# ------------- secp256k1 special-form reduction -------------
+#
+# x = hi * 2^256 + lo  ==  lo + hi * C  (mod p)
+# A couple of folds replace the generic division of "% p".
+
+def _fold_full(x):
+    """x >= 0 -> x mod p"""
+    while x >> 256:
+        x = (x & _MASK256) + (x >> 256) * _C
+    if x >= p:
+        x -= p
+    return x
+
+def _fold_lazy(x):
+    """x >= 0 -> value < 2^257, congruent to x (mod p)"""
+    while x >> 257:
+        x = (x & _MASK256) + (x >> 256) * _C
+    return x
+
+
+def _add_secp(a, b):
+    return _fold_full(a + b)
+
+def _sub_secp(a, b):
+    return _fold_full(a - b + p)
+
+def _mul_secp(a, b):
+    return _fold_full(a * b)
+
+def _neg_secp(a):
+    return p - a if a else 0
+
+
+# Lazy mode: every value is kept in [0, 2^257) and only
+# normalized at comparisons (f_eq) and at output (f_norm).
+
+def _add_lazy(a, b):
+    # a + b < 2^258: one fold
+    x = a + b
+    return (x & _MASK256) + (x >> 256) * _C
+
+def _sub_lazy(a, b):
+    # b < 2^257 < 4p, so the sum stays non-negative and < 2^259
+    x = a - b + _P4
+    return (x & _MASK256) + (x >> 256) * _C
+
+def _mul_lazy(a, b):
+    # a * b < 2^514: two folds -> < 2^256 + 2^69
+    x = a * b
+    x = (x & _MASK256) + (x >> 256) * _C
+    return (x & _MASK256) + (x >> 256) * _C
+
+def _neg_lazy(a):
+    return _fold_lazy(_P4 - a)
+
+def _eq_lazy(a, b):
+    return (a - b) % p == 0
+
+def _norm_lazy(a):
+    return a % p
+
+
+# ------------- Global field mode -------------
+
+_MODES = {
+    "generic": (f_add, f_sub, f_mul, f_neg, f_eq, f_norm),
+    "secp256k1": (_add_secp, _sub_secp, _mul_secp, _neg_secp, f_eq, f_norm),
+    "lazy": (_add_lazy, _sub_lazy, _mul_lazy, _neg_lazy, _eq_lazy, _norm_lazy),
+}
+_MODE_NAMES = ("f_add", "f_sub", "f_mul", "f_neg", "f_eq", "f_norm")
+_field_mode = "generic"
+
+
+def get_field_mode():
+    return _field_mode
+
+
+def set_field_mode(mode):
+    """
+    Switch the arithmetic behind f_add / f_sub / f_mul / f_neg /
+    f_eq / f_norm for every module that imported them:
+
+      "generic"   : "% p" after every operation (default)
+      "secp256k1" : special-form fold reduction, fully reduced
+      "lazy"      : fold reduction, redundant values < 2^257
+    """
+    global _field_mode
+    if mode not in _MODES:
+        raise ValueError(f"unknown field mode: {mode}")
+
+    for name, new in zip(_MODE_NAMES, _MODES[mode]):
+        old = globals()[name]
+        if old is new:
+            continue
+        for mod in list(sys.modules.values()):
+            if getattr(mod, "__dict__", {}).get(name) is old:
+                setattr(mod, name, new)
+
+    _field_mode = mode
+
+
 # Point at infinity can also live here if you prefer:
 INF = (1, 1, 0)
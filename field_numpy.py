@@ -0,0 +1,177 @@
+# ==========================================================
+#   Vectorized field arithmetic for secp256k1  (GF(p))
+#   Arrays of elements as NumPy limbs: 10 x 26-bit, int64 lanes
+# ==========================================================
+#
+# An array of n field elements has shape (NUM_LIMBS, n):
+# row i holds limb i (weight 2^(26*i)) of every element, so each
+# operation below runs over all n lanes at once.
+#
+# Outputs of add/sub/mul/sqr are "loose": signed limbs with
+# |limb| < 2^27, congruent to the result mod p. Carries are
+# propagated with a few parallel passes instead of a limb-by-limb
+# ripple. v_normalize() gives the canonical value in [0, p).
+
+import numpy as np
+
+from field import p
+
+LIMB_BITS = 26
+NUM_LIMBS = 10
+LIMB_MASK = (1 << LIMB_BITS) - 1
+
+# 2^260 mod p = 16 * (2^32 + 977) = 1024 * 2^26 + 15632
+_FOLD_C0 = 15632
+_FOLD_C1 = 1024
+
+# 2^256 mod p = 2^32 + 977 = 64 * 2^26 + 977  (used by v_normalize)
+_TOP_SHIFT = 256 - LIMB_BITS * (NUM_LIMBS - 1)
+_TOP_MASK = (1 << _TOP_SHIFT) - 1
+_NORM_C0 = 977
+_NORM_C1 = 64
+
+_P_LIMBS = np.array(
+    [(p >> (LIMB_BITS * i)) & LIMB_MASK for i in range(NUM_LIMBS)],
+    dtype=np.int64,
+).reshape(-1, 1)
+
+
+# ------------- Conversion -------------
+
+def to_limbs(values):
+    """List of ints in [0, 2^260) -> (NUM_LIMBS, n) int64 array."""
+    values = list(values)
+    return np.array(
+        [[(v >> (LIMB_BITS * i)) & LIMB_MASK for v in values] for i in range(NUM_LIMBS)],
+        dtype=np.int64,
+    ).reshape(NUM_LIMBS, len(values))
+
+
+def from_limbs(a):
+    """(NUM_LIMBS, n) array -> list of canonical ints in [0, p)."""
+    a = v_normalize(a)
+    out = a[0].astype(object)
+    for i in range(1, NUM_LIMBS):
+        out = out + (a[i].astype(object) << (LIMB_BITS * i))
+    return [int(v) for v in out]
+
+
+def v_zeros(n):
+    return np.zeros((NUM_LIMBS, n), dtype=np.int64)
+
+
+def v_const(c, n):
+    """Broadcast one field element to n lanes."""
+    return np.repeat(to_limbs([c]), n, axis=1)
+
+
+# ------------- Carry / reduction -------------
+
+def _carry_pass(t):
+    """One parallel carry step; the top row keeps its high bits."""
+    c = t[:-1] >> LIMB_BITS
+    t[:-1] &= LIMB_MASK
+    t[1:] += c
+    return t
+
+
+def _reduce(t):
+    """
+    Bring a (k, n) array with |column| < 2^58 and k > NUM_LIMBS
+    back to NUM_LIMBS loose limbs, folding with 2^260 = C (mod p).
+    """
+    _carry_pass(t)
+    _carry_pass(t)
+
+    if t.shape[0] > NUM_LIMBS + 1:
+        hi = t[NUM_LIMBS:]
+        h = hi.shape[0]
+
+        out = np.zeros((NUM_LIMBS + 1, t.shape[1]), dtype=np.int64)
+        out[:NUM_LIMBS] = t[:NUM_LIMBS]
+        out[:h] += hi * _FOLD_C0
+        out[1:h + 1] += hi * _FOLD_C1
+
+        t = out
+        _carry_pass(t)
+        _carry_pass(t)
+
+    # Single small row left above 2^260
+    hi = t[NUM_LIMBS]
+    t = t[:NUM_LIMBS]
+    t[0] += hi * _FOLD_C0
+    t[1] += hi * _FOLD_C1
+
+    return _carry_pass(t)
+
+
+def _ripple(t):
+    """Sequential carry: rows 0..8 in [0, 2^26), row 9 signed."""
+    for i in range(NUM_LIMBS - 1):
+        c = t[i] >> LIMB_BITS
+        t[i] &= LIMB_MASK
+        t[i + 1] += c
+    return t
+
+
+def v_normalize(a):
+    """Canonical representative in [0, p), limb by limb."""
+    t = _ripple(a.copy())
+
+    # Fold bits >= 256 (possibly negative) until value is in [0, 2^256)
+    while True:
+        hi = t[NUM_LIMBS - 1] >> _TOP_SHIFT
+        if not hi.any():
+            break
+        t[NUM_LIMBS - 1] &= _TOP_MASK
+        t[0] += hi * _NORM_C0
+        t[1] += hi * _NORM_C1
+        _ripple(t)
+
+    # value < 2^256 < 2p -> one conditional subtraction
+    d = _ripple(t - _P_LIMBS)
+    keep = d[NUM_LIMBS - 1] < 0
+    return np.where(keep, t, d)
+
+
+def v_is_zero(a):
+    """Boolean lane mask: a == 0 (mod p)."""
+    return ~v_normalize(a).any(axis=0)
+
+
+# ------------- Field operations -------------
+
+def v_add(a, b):
+    t = np.zeros((NUM_LIMBS + 1, a.shape[1]), dtype=np.int64)
+    t[:NUM_LIMBS] = a + b
+    return _reduce(t)
+
+
+def v_sub(a, b):
+    t = np.zeros((NUM_LIMBS + 1, a.shape[1]), dtype=np.int64)
+    t[:NUM_LIMBS] = a - b
+    return _reduce(t)
+
+
+def v_neg(a):
+    return v_sub(v_zeros(a.shape[1]), a)
+
+
+def v_mul(a, b):
+    # Schoolbook product: |column| < 10 * 2^54 < 2^58
+    t = np.zeros((2 * NUM_LIMBS, a.shape[1]), dtype=np.int64)
+    for i in range(NUM_LIMBS):
+        t[i:i + NUM_LIMBS] += a[i] * b
+
+    return _reduce(t)
+
+
+def v_sqr(a):
+    # Cross products once, doubled
+    t = np.zeros((2 * NUM_LIMBS, a.shape[1]), dtype=np.int64)
+    for i in range(NUM_LIMBS):
+        t[2 * i] += a[i] * a[i]
+        if i + 1 < NUM_LIMBS:
+            t[2 * i + 1:i + NUM_LIMBS] += 2 * a[i] * a[i + 1:]
+
+    return _reduce(t)
@@ -0,0 +1,91 @@
+# ==========================================================
+#   Deterministic test vectors (points k*G, seeded scalars)
+#   with an on-disk cache in the point_file format
+# ==========================================================
+import os
+import random
+
+from jacobian import jacobian_mixed_add
+from normalize import batch_to_affine
+from point_file import write_points, write_scalars, load_points, load_scalars
+
+Gx = 55066263022277343669578718895168534326250603453777594175500187360389116729240
+Gy = 32670510020758816978083085130507043184471273380659243275938904335757337482424
+G = (Gx, Gy)
+
+# Cache location: $MSM_FIXTURE_DIR, else .fixtures/ next to this file
+CACHE_DIR = os.environ.get(
+    "MSM_FIXTURE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fixtures"),
+)
+
+
+# ------------------------------------------------------------
+# Generators
+# ------------------------------------------------------------
+
+def generate_points(n, base=G):
+    """
+    [1*base, 2*base, ..., n*base] in affine form.
+    Walks k*base in Jacobian coordinates (one mixed add per point),
+    then normalizes every point with a single batch_to_affine.
+    """
+    jac = []
+    P = (base[0], base[1], 1)
+    for _ in range(n):
+        jac.append(P)
+        P = jacobian_mixed_add(P, base)
+
+    return batch_to_affine(jac)
+
+
+def generate_scalars(n, bits=256, seed=0):
+    """n scalars of `bits` random bits, fixed by (seed, n, bits)."""
+    rng = random.Random(f"{seed}:{n}:{bits}")
+    return [rng.getrandbits(bits) for _ in range(n)]
+
+
+# ------------------------------------------------------------
+# Cached fixtures
+# ------------------------------------------------------------
+
+def _write_atomic(write, path, values):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp, values)
+    os.replace(tmp, path)
+
+
+def _read_all(load, path):
+    with load(path) as records:
+        return list(records)
+
+
+def fixture(n, bits=256, seed=0, cache=True, cache_dir=None):
+    """
+    (scalars, points) for an n-term MSM, keyed by (seed, n, bits).
+    With cache=True both are read from / written to cache_dir
+    (default CACHE_DIR). Points only depend on n, so one points
+    file serves every seed and bit-length.
+    """
+    if not cache:
+        return generate_scalars(n, bits, seed), generate_points(n)
+
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+
+    points_path = os.path.join(cache_dir, f"points_{n}.msmp")
+    scalars_path = os.path.join(cache_dir, f"scalars_{seed}_{n}_{bits}.msms")
+
+    if os.path.exists(points_path):
+        points = _read_all(load_points, points_path)
+    else:
+        points = generate_points(n)
+        _write_atomic(write_points, points_path, points)
+
+    if os.path.exists(scalars_path):
+        scalars = _read_all(load_scalars, scalars_path)
+    else:
+        scalars = generate_scalars(n, bits, seed)
+        _write_atomic(write_scalars, scalars_path, scalars)
+
+    return scalars, points
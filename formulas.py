@@ -0,0 +1,458 @@
+# ==========================================================
+#   Point-formula DSL -> straight-line Python with static counts
+# ==========================================================
+#
+# Each formula is written once, in a small line-based DSL:
+#
+#   formula jacobian_mixed_add(P: X1 Y1 Z1, Q: x2 y2)
+#       guard Z1 == 0 -> (x2, y2, 1)
+#       Z1_sq = Z1^2
+#       ...
+#       -> (X3, Y3, Z3)
+#
+#   NAME(ARG: coords, ...)   tuple arguments, unpacked on entry
+#   guard COND -> EXPR       early exit; field comparisons in COND
+#                            are done mod p, EXPR is plain Python
+#   v = EXPR                 field expression: + - * ^2, small ints
+#   -> (a, b, ...)           result
+#
+# compile_formula() emits one Python function per formula, with the
+# arithmetic inlined (one "% p" per statement, no f_* calls), and
+# counts its operations statically:
+#
+#   mul   : product of two field values
+#   sqr   : x^2 / x * x
+#   const : product with a small integer constant
+#   add   : addition, subtraction, negation
+#
+# Every compiled function also has a `counted` twin that adds the
+# field muls (mul + sqr + const) taken up to each exit to
+# op_counter.field_mul_count, so a profiled run counts exactly what
+# the hand-written formula's f_mul calls would. profiler.profile()
+# calls that twin, so nothing is counted at runtime otherwise.
+# field_muls() leaves the small constants out: that is the cost
+# model's figure, not the profiler's.
+#
+# use_compiled_formulas() swaps the hand-written formulas of
+# jacobian / extended_jacobian / xyzz for the compiled ones in every
+# importing module, like field.set_field_mode. Compiled formulas
+# always reduce with "% p", whatever the field mode.
+
+import ast
+import re
+import sys
+
+import op_counter
+import jacobian
+import extended_jacobian
+import xyzz
+from field import p, INF
+from extended_jacobian import EXT_INF, to_extended
+from xyzz import XYZZ_INF, to_xyzz
+
+_fc = vars(op_counter)
+
+
+# ------------------------------------------------------------
+# Formulas
+# ------------------------------------------------------------
+
+SOURCES = {
+    jacobian: """
+formula jacobian_double(P: X1 Y1 Z1)
+    guard Z1 == 0 or Y1 == 0 -> INF
+    Y1_sq = Y1^2
+    S = 4 * X1 * Y1_sq
+    M = 3 * X1^2
+    X3 = M^2 - 2 * S
+    Y3 = M * (S - X3) - 8 * Y1_sq^2
+    Z3 = 2 * Y1 * Z1
+    -> (X3, Y3, Z3)
+
+formula jacobian_mixed_add(P: X1 Y1 Z1, Q: x2 y2)
+    guard Z1 == 0 -> (x2, y2, 1)
+    Z1_sq = Z1^2
+    U2 = x2 * Z1_sq
+    Z1_cu = Z1_sq * Z1
+    S2 = y2 * Z1_cu
+    guard U2 == X1 and S2 != Y1 -> INF
+    guard U2 == X1 -> jacobian_double(P)
+    H = U2 - X1
+    R = S2 - Y1
+    H_sq = H^2
+    H_cu = H_sq * H
+    V = X1 * H_sq
+    X3 = R^2 - H_cu - 2 * V
+    Y3 = R * (V - X3) - Y1 * H_cu
+    Z3 = Z1 * H
+    -> (X3, Y3, Z3)
+
+formula jacobian_add(P: X1 Y1 Z1, Q: X2 Y2 Z2)
+    guard Z1 == 0 -> Q
+    guard Z2 == 0 -> P
+    Z2_sq = Z2^2
+    U1 = X1 * Z2_sq
+    Z1_sq = Z1^2
+    U2 = X2 * Z1_sq
+    S1 = Y1 * Z2_sq * Z2
+    S2 = Y2 * Z1_sq * Z1
+    guard U1 == U2 and S1 != S2 -> INF
+    guard U1 == U2 -> jacobian_double(P)
+    H = U2 - U1
+    R = S2 - S1
+    H_sq = H^2
+    H_cu = H_sq * H
+    V = U1 * H_sq
+    X3 = R^2 - H_cu - 2 * V
+    Y3 = R * (V - X3) - S1 * H_cu
+    Z3 = Z1 * Z2 * H
+    -> (X3, Y3, Z3)
+""",
+
+    extended_jacobian: """
+formula extended_double(P: X1 Y1 Z1 W1)
+    guard Z1 == 0 -> EXT_INF
+    Y1_sq = Y1^2
+    S = 4 * X1 * Y1_sq
+    M = 3 * X1^2
+    X3 = M^2 - 2 * S
+    Y3 = M * (S - X3) - 8 * Y1_sq^2
+    Z3 = 2 * Y1 * Z1
+    W3 = Z3^2
+    -> (X3, Y3, Z3, W3)
+
+formula extended_mixed_add(P: X1 Y1 Z1 W1, Q: x2 y2)
+    guard Z1 == 0 -> to_extended(Q)
+    U2 = x2 * W1
+    S2 = y2 * Z1 * W1
+    guard U2 == X1 and S2 != Y1 -> EXT_INF
+    guard U2 == X1 -> extended_double(P)
+    H = U2 - X1
+    R = S2 - Y1
+    H_sq = H^2
+    H_cu = H_sq * H
+    V = X1 * H_sq
+    X3 = R^2 - H_cu - 2 * V
+    Y3 = R * (V - X3) - Y1 * H_cu
+    Z3 = Z1 * H
+    W3 = Z3^2
+    -> (X3, Y3, Z3, W3)
+
+formula extended_add(P: X1 Y1 Z1 W1, Q: X2 Y2 Z2 W2)
+    guard Z1 == 0 -> Q
+    guard Z2 == 0 -> P
+    U1 = X1 * W2
+    U2 = X2 * W1
+    S1 = Y1 * Z2 * W2
+    S2 = Y2 * Z1 * W1
+    guard U1 == U2 and S1 != S2 -> EXT_INF
+    guard U1 == U2 -> extended_double(P)
+    H = U2 - U1
+    R = S2 - S1
+    H_sq = H^2
+    H_cu = H_sq * H
+    V = U1 * H_sq
+    X3 = R^2 - H_cu - 2 * V
+    Y3 = R * (V - X3) - S1 * H_cu
+    Z3 = Z1 * Z2 * H
+    W3 = Z3^2
+    -> (X3, Y3, Z3, W3)
+""",
+
+    xyzz: """
+formula xyzz_double(P: X1 Y1 ZZ1 ZZZ1)
+    guard ZZ1 == 0 or Y1 == 0 -> XYZZ_INF
+    U = Y1 + Y1
+    V = U^2
+    W = U * V
+    S = X1 * V
+    X1_sq = X1^2
+    M = X1_sq + X1_sq + X1_sq
+    X3 = M^2 - (S + S)
+    Y3 = M * (S - X3) - W * Y1
+    ZZ3 = V * ZZ1
+    ZZZ3 = W * ZZZ1
+    -> (X3, Y3, ZZ3, ZZZ3)
+
+formula xyzz_mixed_add(P: X1 Y1 ZZ1 ZZZ1, Q: x2 y2)
+    guard ZZ1 == 0 -> to_xyzz(Q)
+    U2 = x2 * ZZ1
+    S2 = y2 * ZZZ1
+    guard U2 == X1 and S2 != Y1 -> XYZZ_INF
+    guard U2 == X1 -> xyzz_double(P)
+    H = U2 - X1
+    R = S2 - Y1
+    PP = H^2
+    PPP = H * PP
+    V = X1 * PP
+    X3 = R^2 - PPP - (V + V)
+    Y3 = R * (V - X3) - Y1 * PPP
+    ZZ3 = ZZ1 * PP
+    ZZZ3 = ZZZ1 * PPP
+    -> (X3, Y3, ZZ3, ZZZ3)
+
+formula xyzz_add(P: X1 Y1 ZZ1 ZZZ1, Q: X2 Y2 ZZ2 ZZZ2)
+    guard ZZ1 == 0 -> Q
+    guard ZZ2 == 0 -> P
+    U1 = X1 * ZZ2
+    U2 = X2 * ZZ1
+    S1 = Y1 * ZZZ2
+    S2 = Y2 * ZZZ1
+    guard U1 == U2 and S1 != S2 -> XYZZ_INF
+    guard U1 == U2 -> xyzz_double(P)
+    H = U2 - U1
+    R = S2 - S1
+    PP = H^2
+    PPP = H * PP
+    V = U1 * PP
+    X3 = R^2 - PPP - (V + V)
+    Y3 = R * (V - X3) - S1 * PPP
+    ZZ3 = ZZ1 * ZZ2 * PP
+    ZZZ3 = ZZZ1 * ZZZ2 * PPP
+    -> (X3, Y3, ZZ3, ZZZ3)
+""",
+}
+
+
+# ------------------------------------------------------------
+# Parser
+# ------------------------------------------------------------
+
+_HEADER = re.compile(r"formula\s+(\w+)\((.*)\)$")
+_ASSIGN = re.compile(r"(\w+)\s*=\s*(.+)$")
+_GUARD = re.compile(r"guard\s+(.+?)\s*->\s*(.+)$")
+_RETURN = re.compile(r"->\s*(.+)$")
+
+
+def parse_formulas(text):
+    """DSL text -> [(name, [(arg, coords), ...], [statement, ...])]"""
+    formulas = []
+
+    for raw in text.splitlines():
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+
+        m = _HEADER.match(line)
+        if m:
+            args = []
+            for part in m.group(2).split(","):
+                arg, coords = part.split(":")
+                args.append((arg.strip(), coords.split()))
+            formulas.append((m.group(1), args, []))
+            continue
+
+        if not formulas:
+            raise SyntaxError(f"statement outside a formula: {line}")
+        body = formulas[-1][2]
+
+        m = _GUARD.match(line)
+        if m:
+            body.append(("guard", m.group(1), m.group(2)))
+            continue
+        m = _RETURN.match(line)
+        if m:
+            body.append(("return", m.group(1)))
+            continue
+        m = _ASSIGN.match(line)
+        if m:
+            body.append(("assign", m.group(1), m.group(2)))
+            continue
+
+        raise SyntaxError(f"bad formula line: {line}")
+
+    return formulas
+
+
+# ------------------------------------------------------------
+# Expressions: static counts + inlined code
+# ------------------------------------------------------------
+
+def _is_const(node):
+    return isinstance(node, ast.Constant) and isinstance(node.value, int)
+
+
+class _Arith(ast.NodeTransformer):
+    """Counts field operations; rewrites x**2 as x * x."""
+
+    def __init__(self, counts):
+        self.counts = counts
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+
+        if isinstance(node.op, ast.Pow):
+            if not (_is_const(node.right) and node.right.value == 2):
+                raise SyntaxError("only ^2 is supported")
+            self.counts["sqr"] += 1
+            return ast.BinOp(node.left, ast.Mult(), node.left)
+
+        if isinstance(node.op, ast.Mult):
+            if _is_const(node.left) or _is_const(node.right):
+                self.counts["const"] += 1
+            elif ast.dump(node.left) == ast.dump(node.right):
+                self.counts["sqr"] += 1
+            else:
+                self.counts["mul"] += 1
+        elif isinstance(node.op, (ast.Add, ast.Sub)):
+            self.counts["add"] += 1
+        else:
+            raise SyntaxError(f"unsupported operator: {type(node.op).__name__}")
+        return node
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.USub):
+            self.counts["add"] += 1
+        return node
+
+
+class _Compare(ast.NodeTransformer):
+    """a == b  ->  (a - b) % p == 0   (same for !=)"""
+
+    def visit_Compare(self, node):
+        if len(node.ops) != 1 or not isinstance(node.ops[0], (ast.Eq, ast.NotEq)):
+            raise SyntaxError("guards compare with a single == or !=")
+        left, right = node.left, node.comparators[0]
+        diff = left if _is_const(right) and right.value == 0 else ast.BinOp(left, ast.Sub(), right)
+        reduced = ast.BinOp(diff, ast.Mod(), ast.Name("p", ast.Load()))
+        return ast.Compare(reduced, node.ops, [ast.Constant(0)])
+
+
+def _field_expr(text, counts):
+    tree = ast.parse(text.replace("^", "**"), mode="eval")
+    return ast.unparse(_Arith(counts).visit(tree.body))
+
+
+def _guard_cond(text):
+    tree = ast.parse(text, mode="eval")
+    return ast.unparse(_Compare().visit(tree.body))
+
+
+# ------------------------------------------------------------
+# Code generation
+# ------------------------------------------------------------
+
+def compile_formula(name, args, body):
+    """
+    -> (source, counts). The source defines `name` and its counted
+    twin `_<name>_counted`.
+    """
+    counts = {"mul": 0, "sqr": 0, "const": 0, "add": 0}
+    lines = []       # (kind, code, muls so far)
+
+    for stmt in body:
+        if stmt[0] == "assign":
+            code = f"{stmt[1]} = ({_field_expr(stmt[2], counts)}) % p"
+        elif stmt[0] == "guard":
+            code = f"if {_guard_cond(stmt[1])}: return {stmt[2]}"
+        else:
+            code = f"return {stmt[1]}"
+        lines.append((stmt[0], code, counts["mul"] + counts["sqr"] + counts["const"]))
+
+    if not lines or lines[-1][0] != "return":
+        raise SyntaxError(f"{name}: formula must end with '-> result'")
+
+    params = ", ".join(arg for arg, _ in args)
+    unpack = [f"    {', '.join(coords)} = {arg}" for arg, coords in args]
+
+    plain = [f"def {name}({params}):"] + unpack
+    counted = [f"def _{name}_counted({params}):"] + unpack
+
+    for kind, code, muls in lines:
+        plain.append(f"    {code}")
+        if kind == "assign":
+            counted.append(f"    {code}")
+        else:
+            cond, _, result = code.rpartition("return ")
+            bump = f'_fc["field_mul_count"] += {muls}'
+            if kind == "guard":
+                counted.append(f"    {cond.rstrip()}")
+                if muls:
+                    counted.append(f"        {bump}")
+                counted.append(f"        return {result}")
+            else:
+                counted.append(f"    {bump}")
+                counted.append(f"    return {result}")
+
+    return "\n".join(plain) + "\n\n\n" + "\n".join(counted) + "\n", counts
+
+
+# ------------------------------------------------------------
+# Compile everything at import
+# ------------------------------------------------------------
+
+ORIGINALS = {}        # name -> hand-written function
+COMPILED = {}         # name -> compiled function
+FORMULA_COUNTS = {}   # name -> {"mul", "sqr", "const", "add"}
+
+
+def _build():
+    namespace = globals()
+    for module, text in SOURCES.items():
+        for name, args, body in parse_formulas(text):
+            source, counts = compile_formula(name, args, body)
+            exec(compile(source, f"<formula {name}>", "exec"), namespace)
+
+            fn = namespace[name]
+            fn.counted = namespace[f"_{name}_counted"]
+            fn.op_counts = counts
+            fn.source = source
+
+            ORIGINALS[name] = getattr(module, name)
+            COMPILED[name] = fn
+            FORMULA_COUNTS[name] = counts
+
+
+_build()
+
+
+def field_muls(name):
+    """Static field muls (mul + sqr) of one formula's main path."""
+    counts = FORMULA_COUNTS[name]
+    return counts["mul"] + counts["sqr"]
+
+
+# ------------------------------------------------------------
+# Switch hand-written <-> compiled formulas
+# ------------------------------------------------------------
+
+_use_compiled = False
+
+
+def compiled_formulas_enabled():
+    return _use_compiled
+
+
+def use_compiled_formulas(enabled=True):
+    """
+    Rebind jacobian_* / extended_* / xyzz_* in every module that
+    imported them to the compiled (True) or hand-written (False)
+    formulas. Call it outside profile().
+    """
+    global _use_compiled
+    for name in COMPILED:
+        old, new = (ORIGINALS[name], COMPILED[name]) if enabled else (COMPILED[name], ORIGINALS[name])
+        for mod in list(sys.modules.values()):
+            if getattr(mod, "__dict__", {}).get(name) is old:
+                setattr(mod, name, new)
+
+        # Calls between compiled formulas (guard -> double) go
+        # through this module's globals
+        globals()[name] = COMPILED[name]
+
+    _use_compiled = enabled
+
+
+def print_formula_counts():
+    print(f"\n{'Formula':<20} | {'Mul':>4} | {'Sqr':>4} | {'Const':>5} | {'Add':>4} | {'Field muls':>10}")
+    print("-" * 62)
+    for name, c in FORMULA_COUNTS.items():
+        print(
+            f"{name:<20} | {c['mul']:>4} | {c['sqr']:>4} | {c['const']:>5} | "
+            f"{c['add']:>4} | {c['mul'] + c['sqr']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    print_formula_counts()
@@ -0,0 +1,82 @@
+# ==========================================================
+#   GLV endomorphism for secp256k1
+#   phi(x, y) = (beta * x, y) = lambda * (x, y)
+# ==========================================================
+from field import f_mul, f_neg
+
+# Group order
+n = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+# beta^3 == 1 (mod p), lambda^3 == 1 (mod n)
+BETA = 0x7AE96A2B657C07106E64479EAC3434E99CF0497512F58995C1396C28719501EE
+LAMBDA = 0x5363AD4CC05C30E0A5261C028812645A122E22EA20816678DF02967C1B23BD72
+
+# Short lattice basis {(a1, b1), (a2, b2)} with a + b*lambda == 0 (mod n)
+A1 = 0x3086D221A7D46BCDE86C90E49284EB15
+B1 = -0xE4437ED6010E88286F547FA90ABFE4C3
+A2 = 0x114CA50F7A8E2F3F657C1108D9D44CFD8
+B2 = 0x3086D221A7D46BCDE86C90E49284EB15
+
+
+def _round_div(a, b):
+    """round(a / b) for integers, b > 0"""
+    return (2 * a + b) // (2 * b)
+
+
+# ------------------------------------------------------------
+# Scalar decomposition
+# ------------------------------------------------------------
+
+def glv_split(k):
+    """
+    Split k into (k1, k2) with k == k1 + k2 * lambda (mod n).
+    Both halves are signed and at most ~128 bits.
+    """
+    k %= n
+
+    c1 = _round_div(B2 * k, n)
+    c2 = _round_div(-B1 * k, n)
+
+    k1 = k - c1 * A1 - c2 * A2
+    k2 = -c1 * B1 - c2 * B2
+
+    return k1, k2
+
+
+def glv_endomorphism(P_aff):
+    """phi(P) = lambda * P, one field mul."""
+    x, y = P_aff
+    return (f_mul(BETA, x), y)
+
+
+# ------------------------------------------------------------
+# MSM preprocessing
+# ------------------------------------------------------------
+
+def glv_preprocess(scalars, points):
+    """
+    Turn an N-term MSM with 256-bit scalars into an equivalent
+    2N-term MSM with ~128-bit non-negative scalars:
+        s * P = k1 * P + k2 * phi(P)
+    Negative halves are absorbed by negating the point.
+    """
+    new_scalars = []
+    new_points = []
+
+    for s, P in zip(scalars, points):
+        k1, k2 = glv_split(s)
+        Q = glv_endomorphism(P)
+
+        if k1 < 0:
+            k1 = -k1
+            P = (P[0], f_neg(P[1]))
+        if k2 < 0:
+            k2 = -k2
+            Q = (Q[0], f_neg(Q[1]))
+
+        new_scalars.append(k1)
+        new_points.append(P)
+        new_scalars.append(k2)
+        new_points.append(Q)
+
+    return new_scalars, new_points
@@ -1,5 +1,4 @@
-from field import f_add, f_sub, f_mul, f_inv, f_neg, p, INF
-import op_counter
+from field import f_add, f_sub, f_mul, f_inv, f_neg, f_eq, f_norm, p, INF
 
 
 # ----------------------------------------------------------
@@ -7,34 +6,34 @@ import op_counter
 # ----------------------------------------------------------
 
 def jacobian_double(P):
-    op_counter.jacobian_double_count += 1
+    # 3M + 4S + 5 small-constant muls
     X1, Y1, Z1 = P
 
-    if Z1 == 0 or Y1 == 0:
+    if Z1 == 0 or f_eq(Y1, 0):
         return INF
 
     # S = 4 * X1 * Y1^2
-    Y1_sq = f_mul(Y1, Y1)                # Y1^2 #1
-    S = f_mul(4, f_mul(X1, Y1_sq))       # S = 4X1(Y1^2) #2
+    Y1_sq = f_mul(Y1, Y1)                # Y1^2
+    S = f_mul(4, f_mul(X1, Y1_sq))       # S = 4X1(Y1^2)
 
     # M = 3 * X1^2   (because a = 0 in secp256k1)
-    X1_sq = f_mul(X1, X1) #3
+    X1_sq = f_mul(X1, X1)
     M = f_mul(3, X1_sq)
 
     # X3 = M^2 - 2*S
-    X3 = f_sub(f_mul(M, M), f_mul(2, S)) #4
+    X3 = f_sub(f_mul(M, M), f_mul(2, S))
 
     # Y3 = M*(S - X3) - 8*(Y1^2)^2
-    Y1_sq_sq = f_mul(Y1_sq, Y1_sq)       # (Y1^2)^2 #5
+    Y1_sq_sq = f_mul(Y1_sq, Y1_sq)       # (Y1^2)^2
     Y3 = f_sub(
-            f_mul(M, f_sub(S, X3)),  #6
+            f_mul(M, f_sub(S, X3)),
             f_mul(8, Y1_sq_sq)
         )
 
     # Z3 = 2 * Y1 * Z1
-    Z3 = f_mul(2, f_mul(Y1, Z1)) #7
+    Z3 = f_mul(2, f_mul(Y1, Z1))
 
-    return (X3 % p, Y3 % p, Z3 % p)
+    return (X3, Y3, Z3)
 
 # ----------------------------------------------------------
 #  Mixed Addition   (Jacobian P + Affine Q with Z2 = 1)
@@ -42,47 +41,48 @@ def jacobian_double(P):
 # ----------------------------------------------------------
 
 def jacobian_mixed_add(P, Q):
-    op_counter.jacobian_mixed_add_count += 1
+    # 8M + 3S + 1 small-constant mul
     X1, Y1, Z1 = P
     x2, y2 = Q   # Affine (Z2 = 1)
 
     if Z1 == 0:
         return (x2, y2, 1)
 
-    Z1_sq = f_mul(Z1, Z1) #1
-    U2 = f_mul(x2, Z1_sq)  #2
-    Z1_cu = f_mul(Z1_sq, Z1)  #3
-    S2 = f_mul(y2, Z1_cu)   #4
+    Z1_sq = f_mul(Z1, Z1)
+    U2 = f_mul(x2, Z1_sq)
+    Z1_cu = f_mul(Z1_sq, Z1)
+    S2 = f_mul(y2, Z1_cu)
 
-    if U2 == X1:
-        if S2 != Y1:
+    if f_eq(U2, X1):
+        if not f_eq(S2, Y1):
             return INF
         return jacobian_double(P)
 
     H = f_sub(U2, X1)
     R = f_sub(S2, Y1)
 
-    H_sq = f_mul(H, H)  #5
-    H_cu = f_mul(H_sq, H)  #6
+    H_sq = f_mul(H, H)
+    H_cu = f_mul(H_sq, H)
+
+    V = f_mul(X1, H_sq)
 
     X3 = f_sub(
-            f_sub(f_mul(R, R), H_cu),  #7
-            f_mul(2, f_mul(X1, H_sq))  #8
+            f_sub(f_mul(R, R), H_cu),
+            f_mul(2, V)
         )
 
     Y3 = f_sub(
-            f_mul(R, f_sub(f_mul(X1, H_sq), X3)), #8
-            f_mul(Y1, H_cu) #9
+            f_mul(R, f_sub(V, X3)),
+            f_mul(Y1, H_cu)
         )
 
-    Z3 = f_mul(Z1, H) #10
+    Z3 = f_mul(Z1, H)
 
-    return (X3 % p, Y3 % p, Z3 % p)
+    return (X3, Y3, Z3)
 
 
 def jacobian_add(P, Q):
-    op_counter.jacobian_add_count += 1
-
+    # 12M + 4S + 1 small-constant mul
     X1, Y1, Z1 = P
     X2, Y2, Z2 = Q
 
@@ -91,42 +91,100 @@ def jacobian_add(P, Q):
     if Z2 == 0:
         return P
 
-    Z2_sq = f_mul(Z2, Z2)  #1
-    U1 = f_mul(X1, Z2_sq)  #2
+    Z2_sq = f_mul(Z2, Z2)
+    U1 = f_mul(X1, Z2_sq)
 
-    Z1_sq = f_mul(Z1, Z1) #3
-    U2 = f_mul(X2, Z1_sq)  #4
+    Z1_sq = f_mul(Z1, Z1)
+    U2 = f_mul(X2, Z1_sq)
 
-    Z2_cu = f_mul(Z2_sq, Z2) #5
-    S1 = f_mul(Y1, Z2_cu)   #6
+    Z2_cu = f_mul(Z2_sq, Z2)
+    S1 = f_mul(Y1, Z2_cu)
 
-    Z1_cu = f_mul(Z1_sq, Z1)  #7
-    S2 = f_mul(Y2, Z1_cu)    #8
+    Z1_cu = f_mul(Z1_sq, Z1)
+    S2 = f_mul(Y2, Z1_cu)
 
-    if U1 == U2:
-        if S1 != S2:
+    if f_eq(U1, U2):
+        if not f_eq(S1, S2):
             return INF
         return jacobian_double(P)
 
     H = f_sub(U2, U1)
     R = f_sub(S2, S1)
 
-    H_sq = f_mul(H, H)  #9
-    H_cu = f_mul(H_sq, H) #10
+    H_sq = f_mul(H, H)
+    H_cu = f_mul(H_sq, H)
+
+    V = f_mul(U1, H_sq)
 
     X3 = f_sub(
-            f_sub(f_mul(R, R), H_cu),  #11
-            f_mul(2, f_mul(U1, H_sq))  #12
+            f_sub(f_mul(R, R), H_cu),
+            f_mul(2, V)
          )
 
     Y3 = f_sub(
-            f_mul(R, f_sub(f_mul(U1, H_sq), X3)),  #12
-            f_mul(S1, H_cu)  #13
+            f_mul(R, f_sub(V, X3)),
+            f_mul(S1, H_cu)
          )
 
-    Z3 = f_mul(f_mul(Z1, Z2), H)  #13 #14
+    Z3 = f_mul(f_mul(Z1, Z2), H)
+
+    return (X3, Y3, Z3)
+
+
+# ----------------------------------------------------------
+#  Repeated doubling  (2^m * P, shift_window)
+# ----------------------------------------------------------
+#
+# With a = 0, doubling never reads Z: X and Y follow
+#     X' = M^2 - 2S,  Y' = M(S - X') - 8Y^4   (M = 3X^2, S = 4XY^2)
+# whatever the coordinate system, and the Z part of m doublings
+# collapses to one factor T = 2^m * Y_0 * Y_1 * ... * Y_(m-1):
+#     Jacobian  Z_m = Z * T,   XYZZ  ZZ_m = ZZ * T^2,  ZZZ_m = ZZZ * T^3
+# so Z (and W / ZZ / ZZZ) is updated once instead of every step.
+
+def double_steps(X, Y, T, m):
+    """
+    m doublings of (X, Y) -> (X_m, Y_m, T * Y_0 * ... * Y_(m-1)).
+    3M + 4S per step, counting the T update. The small constants
+    (3, 4, 8) ride along as shifts / adds of a mul operand; every
+    f_mul reduces, so this is safe in all field modes.
+    """
+    for _ in range(m):
+        T = f_mul(T, Y)
+
+        Y_sq = f_mul(Y, Y)
+        S = f_mul(X, Y_sq << 2)          # 4 X Y^2
+        X_sq = f_mul(X, X)
+        M = X_sq + X_sq + X_sq           # 3 X^2, only fed to f_mul
+
+        X3 = f_sub(f_mul(M, M), f_add(S, S))
+        Y = f_sub(f_mul(M, f_sub(S, X3)), f_mul(Y_sq, Y_sq << 3))
+        X = X3
+
+    return X, Y, T
+
+
+def jacobian_double_repeated(P, m):
+    """
+    2^m * P, same result as m jacobian_double calls.
+    3M + 4S per doubling + 1 small-constant mul
+    (vs 3M + 4S + 5 small-constant muls per jacobian_double),
+    with no per-step INF check or Z / tuple bookkeeping.
+    """
+    X1, Y1, Z1 = P
+
+    if m == 0:
+        return P
+    if Z1 == 0:
+        return INF
+
+    X3, Y3, Z3 = double_steps(X1, Y1, f_mul(Z1, pow(2, m, p)), m)
+
+    # A zero Y on the way (2-torsion) zeroes T
+    if f_eq(Z3, 0):
+        return INF
 
-    return (X3 % p, Y3 % p, Z3 % p)
+    return (X3, Y3, Z3)
 from field import p
 
 def jacobian_to_affine(P):
@@ -140,9 +198,36 @@ def jacobian_to_affine(P):
     if Z == 0:
         return None
 
-    Z_inv = pow(Z, p - 2, p)
+    Z_inv = f_inv(Z)
+    Z_inv_sq = f_mul(Z_inv, Z_inv)
 
-    x = (X * Z_inv * Z_inv) % p
-    y = (Y * Z_inv * Z_inv * Z_inv) % p
+    x = f_norm(f_mul(X, Z_inv_sq))
+    y = f_norm(f_mul(Y, f_mul(Z_inv_sq, Z_inv)))
 
     return (x, y)
+
+
+# ----------------------------------------------------------
+#  Negation and small scalar multiplication
+# ----------------------------------------------------------
+
+def jacobian_neg(P):
+    X, Y, Z = P
+    return (X, f_neg(Y), Z)
+
+
+def jacobian_scalar_mul(k, P):
+    """
+    k * P for Jacobian P and k >= 0 (double-and-add, MSB first).
+    Meant for the small multipliers of bucket bookkeeping.
+    """
+    if k == 0 or P[2] == 0:
+        return INF
+
+    R = P
+    for bit in bin(k)[3:]:
+        R = jacobian_double(R)
+        if bit == "1":
+            R = jacobian_add(R, P)
+
+    return R
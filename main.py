@@ -4,61 +4,57 @@ from msm_naive import msm_naive, is_on_curve
 from msm_reference import msm_reference
 from msm_pippenger import msm_pippenger
 from op_counter import reset_counters, print_counters
+from profiler import profile
 import op_counter
 
 from extended_jacobian import extended_to_affine
 from msm_extended import msm_extended
+from msm_batch_affine import msm_batch_affine
+from xyzz import xyzz_to_affine
+from msm_xyzz import msm_xyzz
+from fixtures import generate_points
+from msm_service import MSMService
 
+import asyncio
 import random
 
 def generate_random_scalars(num_scalars, bits=32):
     max_val = (1 << bits) - 1
     return [random.randint(1, max_val) for _ in range(num_scalars)]
 
-# ------------------------------------------------------------
-# Base point of secp256k1
-# ------------------------------------------------------------
-
-Gx = 55066263022277343669578718895168534326250603453777594175500187360389116729240
-Gy = 32670510020758816978083085130507043184471273380659243275938904335757337482424
-G = (Gx, Gy)
+# Per-engine phase profiles of the last run
+profiles = {}
 
 
 # ------------------------------------------------------------
-# Generate valid curve points for testing
+# Pretty print comparison table
 # ------------------------------------------------------------
 
-def generate_points_from_base(base_point, scalars):
-    """
-    Generate curve points as scalar multiples of base point.
-    Uses naive scalar multiplication (affine).
-    """
-    points = []
-
-    for k in scalars:
-        P = msm_naive([k], [base_point])
-        assert is_on_curve(P)
-        points.append(P)
+def repeated_double_count():
+    return (
+        op_counter.jacobian_double_repeated_count
+        + op_counter.extended_double_repeated_count
+        + op_counter.xyzz_double_repeated_count
+    )
 
-    return points
-
-
-# ------------------------------------------------------------
-# Pretty print comparison table
-# ------------------------------------------------------------
 
 def print_comparison_table():
     print("\n================ Operation Count Comparison ================")
     # הוספתי עמודה בסוף: Total Muls
     print(
-        f"{'Model':<15} | {'Aff add':>7} | {'Jac add':>7} | {'Mix add':>7} | {'Dbl':>7} | {'Ext Add':>7} | {'Ext Mix':>7} | {'Ext Dbl':>7} | {'Total Muls':>11}")
-    print("-" * 118)
+        f"{'Model':<15} | {'Aff add':>7} | {'Jac add':>7} | {'Mix add':>7} | {'Dbl':>7} | {'Ext Add':>7} | {'Ext Mix':>7} | {'Ext Dbl':>7} | {'ZZ Add':>7} | {'ZZ Mix':>7} | {'ZZ Dbl':>7} | {'Rep Dbl':>7} | {'Bat add':>7} | {'Total Muls':>11} | {'Invs':>6}")
+    print("-" * 177)
 
     models = [
         ("Naive", naive_counts),
         ("Reference", reference_counts),
         ("Pippenger", pippenger_counts),
         ("Extended", extended_counts),
+        ("Pippenger sgn", pippenger_signed_counts),
+        ("Extended sgn", extended_signed_counts),
+        ("Pippenger GLV", pippenger_glv_counts),
+        ("Batch affine", batch_affine_counts),
+        ("XYZZ", xyzz_counts),
     ]
 
     for name, c in models:
@@ -71,9 +67,21 @@ def print_comparison_table():
             f"{c.get('ext_add', 0):>7} | "
             f"{c.get('ext_mixed', 0):>7} | "
             f"{c.get('ext_double', 0):>7} | "
-            f"{c.get('total_mul', 0):>11}"  # <--- שליפת הנתון החדש
+            f"{c.get('xyzz_add', 0):>7} | "
+            f"{c.get('xyzz_mixed', 0):>7} | "
+            f"{c.get('xyzz_double', 0):>7} | "
+            f"{c.get('rep_double', 0):>7} | "
+            f"{c.get('batch_affine', 0):>7} | "
+            f"{c.get('total_mul', 0):>11} | "  # <--- שליפת הנתון החדש
+            f"{c.get('total_inv', 0):>6}"
         )
-    print("=" * 118)
+    print("=" * 177)
+
+
+def print_phase_profiles():
+    print("\n================ Per-phase profile ================")
+    for name, prof in profiles.items():
+        prof.report(name)
 
 
 # ------------------------------------------------------------
@@ -87,17 +95,15 @@ def main():
     # --------------------------------------------------------
 
     w = 8  # window size (small for debugging)
+    profiles.clear()
     scalars = generate_random_scalars(num_scalars=2000, bits=256)
 
-    for s in scalars:
-        print(hex(s))
-
     # --------------------------------------------------------
     # Generate curve points
     # --------------------------------------------------------
 
     print("[*] Generating curve points...")
-    points = generate_points_from_base(G, list(range(1, len(scalars) + 1)))
+    points = generate_points(len(scalars))
 
     # --------------------------------------------------------
     # Naive MSM (Affine)
@@ -105,7 +111,9 @@ def main():
 
     print("\n[*] Running Naive MSM...")
     reset_counters()
-    R_naive = msm_naive(scalars, points)
+    with profile() as prof:
+        R_naive = msm_naive(scalars, points)
+    profiles["Naive"] = prof
     assert is_on_curve(R_naive)
     print("Naive MSM result:", R_naive)
     print_counters("Naive MSM")
@@ -116,7 +124,9 @@ def main():
         "jac": op_counter.jacobian_add_count,
         "mixed": op_counter.jacobian_mixed_add_count,
         "double": op_counter.jacobian_double_count,
-        "total_mul": op_counter.field_mul_count
+        "rep_double": repeated_double_count(),
+        "total_mul": op_counter.field_mul_count,
+        "total_inv": op_counter.field_inv_count
     }
 
     # --------------------------------------------------------
@@ -125,7 +135,9 @@ def main():
 
     print("\n[*] Running Reference MSM...")
     reset_counters()
-    R_ref_jacobian = msm_reference(scalars, points, w=w)
+    with profile() as prof:
+        R_ref_jacobian = msm_reference(scalars, points, w=w)
+    profiles["Reference"] = prof
     R_ref = jacobian_to_affine(R_ref_jacobian)
     assert is_on_curve(R_ref)
     print("Reference MSM result:", R_ref)
@@ -137,7 +149,9 @@ def main():
         "jac": op_counter.jacobian_add_count,
         "mixed": op_counter.jacobian_mixed_add_count,
         "double": op_counter.jacobian_double_count,
-        "total_mul": op_counter.field_mul_count
+        "rep_double": repeated_double_count(),
+        "total_mul": op_counter.field_mul_count,
+        "total_inv": op_counter.field_inv_count
     }
 
     # --------------------------------------------------------
@@ -146,7 +160,9 @@ def main():
 
     print("\n[*] Running Pippenger MSM...")
     reset_counters()
-    R_fast_jacobian = msm_pippenger(scalars, points, w=w)
+    with profile() as prof:
+        R_fast_jacobian = msm_pippenger(scalars, points, w=w)
+    profiles["Pippenger"] = prof
     R_fast = jacobian_to_affine(R_fast_jacobian)
     assert is_on_curve(R_fast)
     print("Pippenger MSM result:", R_fast)
@@ -158,7 +174,9 @@ def main():
         "jac": op_counter.jacobian_add_count,
         "mixed": op_counter.jacobian_mixed_add_count,
         "double": op_counter.jacobian_double_count,
-        "total_mul": op_counter.field_mul_count
+        "rep_double": repeated_double_count(),
+        "total_mul": op_counter.field_mul_count,
+        "total_inv": op_counter.field_inv_count
     }
 
     # --------------------------------------------------------
@@ -169,7 +187,9 @@ def main():
     reset_counters()
 
     # הרצת ה-MSM
-    R_ext_extended = msm_extended(scalars, points, w=w)
+    with profile() as prof:
+        R_ext_extended = msm_extended(scalars, points, w=w)
+    profiles["Extended"] = prof
 
     # המרה חזרה לאפיני כדי שנוכל להשוות
     R_ext = extended_to_affine(R_ext_extended)
@@ -188,15 +208,142 @@ def main():
         "ext_add": op_counter.extended_add_count,
         "ext_mixed": op_counter.extended_mixed_add_count,
         "ext_double": op_counter.extended_double_count,
-        "total_mul": op_counter.field_mul_count
+        "rep_double": repeated_double_count(),
+        "total_mul": op_counter.field_mul_count,
+        "total_inv": op_counter.field_inv_count
     }
 
+    # --------------------------------------------------------
+    # Signed-digit windows (half the buckets)
+    # --------------------------------------------------------
+
+    print("\n[*] Running Pippenger MSM (signed digits)...")
+    reset_counters()
+    with profile() as prof:
+        R_fast_signed = jacobian_to_affine(msm_pippenger(scalars, points, w=w, signed=True))
+    profiles["Pippenger sgn"] = prof
+    assert is_on_curve(R_fast_signed)
+    print("Pippenger signed MSM result:", R_fast_signed)
+    print_counters("Pippenger MSM (signed digits)")
+
+    global pippenger_signed_counts
+    pippenger_signed_counts = {
+        "affine": op_counter.affine_add_count,
+        "jac": op_counter.jacobian_add_count,
+        "mixed": op_counter.jacobian_mixed_add_count,
+        "double": op_counter.jacobian_double_count,
+        "rep_double": repeated_double_count(),
+        "total_mul": op_counter.field_mul_count,
+        "total_inv": op_counter.field_inv_count
+    }
+
+    print("\n[*] Running Extended MSM (signed digits)...")
+    reset_counters()
+    with profile() as prof:
+        R_ext_signed = extended_to_affine(msm_extended(scalars, points, w=w, signed=True))
+    profiles["Extended sgn"] = prof
+    assert is_on_curve(R_ext_signed)
+    print("Extended signed MSM result:", R_ext_signed)
+    print_counters("Extended MSM (signed digits)")
+
+    global extended_signed_counts
+    extended_signed_counts = {
+        "ext_add": op_counter.extended_add_count,
+        "ext_mixed": op_counter.extended_mixed_add_count,
+        "ext_double": op_counter.extended_double_count,
+        "rep_double": repeated_double_count(),
+        "total_mul": op_counter.field_mul_count,
+        "total_inv": op_counter.field_inv_count
+    }
+
+    # --------------------------------------------------------
+    # GLV endomorphism (half-length scalars)
+    # --------------------------------------------------------
+
+    print("\n[*] Running Pippenger MSM (GLV)...")
+    reset_counters()
+    with profile() as prof:
+        R_fast_glv = jacobian_to_affine(msm_pippenger(scalars, points, w=w, glv=True))
+    profiles["Pippenger GLV"] = prof
+    assert is_on_curve(R_fast_glv)
+    print("Pippenger GLV MSM result:", R_fast_glv)
+    print_counters("Pippenger MSM (GLV)")
+
+    global pippenger_glv_counts
+    pippenger_glv_counts = {
+        "affine": op_counter.affine_add_count,
+        "jac": op_counter.jacobian_add_count,
+        "mixed": op_counter.jacobian_mixed_add_count,
+        "double": op_counter.jacobian_double_count,
+        "rep_double": repeated_double_count(),
+        "total_mul": op_counter.field_mul_count,
+        "total_inv": op_counter.field_inv_count
+    }
+
+    # --------------------------------------------------------
+    # Batch-affine MSM (Montgomery batch inversion)
+    # --------------------------------------------------------
+
+    print("\n[*] Running Batch-affine MSM...")
+    reset_counters()
+    with profile() as prof:
+        R_batch_jacobian = msm_batch_affine(scalars, points, w=w)
+    profiles["Batch affine"] = prof
+    R_batch = jacobian_to_affine(R_batch_jacobian)
+    assert is_on_curve(R_batch)
+    print("Batch-affine MSM result:", R_batch)
+    print_counters("Batch-affine MSM")
+
+    global batch_affine_counts
+    batch_affine_counts = {
+        "affine": op_counter.affine_add_count,
+        "jac": op_counter.jacobian_add_count,
+        "mixed": op_counter.jacobian_mixed_add_count,
+        "double": op_counter.jacobian_double_count,
+        "batch_affine": op_counter.batch_affine_add_count,
+        "rep_double": repeated_double_count(),
+        "total_mul": op_counter.field_mul_count,
+        "total_inv": op_counter.field_inv_count
+    }
+
+    # --------------------------------------------------------
+    # XYZZ MSM (X, Y, ZZ, ZZZ buckets)
+    # --------------------------------------------------------
+
+    print("\n[*] Running XYZZ MSM...")
+    reset_counters()
+    with profile() as prof:
+        R_xyzz_xyzz = msm_xyzz(scalars, points, w=w)
+    profiles["XYZZ"] = prof
+    R_xyzz = xyzz_to_affine(R_xyzz_xyzz)
+    assert is_on_curve(R_xyzz)
+    print("XYZZ MSM result:", R_xyzz)
+    print_counters("XYZZ MSM")
+
+    global xyzz_counts
+    xyzz_counts = {
+        "xyzz_add": op_counter.xyzz_add_count,
+        "xyzz_mixed": op_counter.xyzz_mixed_add_count,
+        "xyzz_double": op_counter.xyzz_double_count,
+        "rep_double": repeated_double_count(),
+        "total_mul": op_counter.field_mul_count,
+        "total_inv": op_counter.field_inv_count
+    }
+
+    # --------------------------------------------------------
+    # MSM service (coalesced requests)
+    # --------------------------------------------------------
+
+    print("\n[*] Running MSM service...")
+    R_service = check_msm_service(scalars, points, w)
+
     # --------------------------------------------------------
     # Final correctness check
     # --------------------------------------------------------
 
     # עדכון שורת הבדיקה
-    assert R_naive == R_ref == R_fast == R_ext
+    assert R_naive == R_ref == R_fast == R_ext == R_batch == R_xyzz
+    assert R_naive == R_fast_signed == R_ext_signed == R_fast_glv == R_service
     print("\n✅ All MSM results match!")
 
     # --------------------------------------------------------
@@ -204,6 +351,38 @@ def main():
     # --------------------------------------------------------
 
     print_comparison_table()
+    print_phase_profiles()
+
+
+# ------------------------------------------------------------
+# MSM service: concurrent requests coalesce into msm_batch passes
+# ------------------------------------------------------------
+
+async def run_service_requests(vectors, points, w):
+    service = MSMService(batch_window=0.01, w=w)
+    service.register("main", points)
+    try:
+        results = await asyncio.gather(*(service.msm("main", v) for v in vectors))
+    finally:
+        await service.close()
+    return results, service.stats
+
+
+def check_msm_service(scalars, points, w, requests=8):
+    # The full MSM (checked by the caller against msm_naive) plus small
+    # ones over the first points, each checked against msm_naive here
+    vectors = [scalars] + [
+        generate_random_scalars(random.randint(0, min(16, len(points))))
+        for _ in range(requests - 1)
+    ]
+    results, stats = asyncio.run(run_service_requests(vectors, points, w))
+
+    for v, R in zip(vectors[1:], results[1:]):
+        assert R == msm_naive(v, points[:len(v)])
+    assert stats["requests"] == len(vectors)
+    assert stats["batches"] < stats["requests"], stats
+    print(f"MSM service: {stats['requests']} requests in {stats['batches']} batch pass(es)")
+    return results[0]
 
 
 # ------------------------------------------------------------
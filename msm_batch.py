@@ -0,0 +1,114 @@
+from field import INF
+from jacobian import jacobian_add, jacobian_mixed_add
+from msm_pippenger import (
+    num_buckets_for,
+    negate_affine,
+    reduce_buckets_pippenger,
+    shift_window
+)
+from glv import glv_split, glv_endomorphism
+from autotune import choose_window
+from scalar_digits import digit_matrix
+from normalize import batch_to_affine
+
+
+# ------------------------------------------------------------
+# Buckets of one window, for every scalar vector at once
+# ------------------------------------------------------------
+
+def build_buckets_batch(rows, points, neg_points, num_buckets, flips=None):
+    """
+    buckets[v][i] = sum of points whose digit in rows[v] is +-i
+
+    Points are walked once: each point is loaded and added into the
+    buckets of every vector before moving on. rows[v] is None for a
+    vector without this window. flips[v][idx] (GLV) negates the term.
+    """
+    buckets = [[INF] * num_buckets for _ in rows]
+    active = [
+        (rows[v], buckets[v], flips[v] if flips else None)
+        for v in range(len(rows)) if rows[v] is not None
+    ]
+
+    for idx in range(len(points)):
+        P_aff = points[idx]
+        P_neg = neg_points[idx]
+
+        for row, vec_buckets, flip in active:
+            b = row[idx]
+            if b == 0:
+                continue
+
+            negative = b < 0
+            if negative:
+                b = -b
+            if flip is not None and flip[idx]:
+                negative = not negative
+            Q = P_neg if negative else P_aff
+
+            if vec_buckets[b] == INF:
+                vec_buckets[b] = (Q[0], Q[1], 1)
+            else:
+                vec_buckets[b] = jacobian_mixed_add(vec_buckets[b], Q)
+
+    return buckets
+
+
+# ------------------------------------------------------------
+# Many MSMs over one point set
+# ------------------------------------------------------------
+
+def msm_batch(scalar_vectors, points, w=16, signed=False, glv=False):
+    """
+    [sum_i scalars[i] * points[i]  for scalars in scalar_vectors]
+
+    Point-side work is shared by all vectors: the negated points
+    (and GLV endomorphism images) are computed once, and every window
+    walks the points once for all vectors (build_buckets_batch).
+    Results are affine (None = infinity), normalized together with
+    a single batch_to_affine.
+    """
+    scalar_vectors = [list(scalars) for scalars in scalar_vectors]
+    points = list(points)
+    if not scalar_vectors:
+        return []
+    for scalars in scalar_vectors:
+        if len(scalars) != len(points):
+            raise ValueError("every scalar vector needs one scalar per point")
+
+    flips = None
+    if glv:
+        # s * P = k1 * P + k2 * phi(P); negative halves flip the point
+        points = points + [glv_endomorphism(P) for P in points]
+        flips = []
+        for v, scalars in enumerate(scalar_vectors):
+            halves = [glv_split(s) for s in scalars]
+            terms = [k1 for k1, _ in halves] + [k2 for _, k2 in halves]
+            flips.append([k < 0 for k in terms])
+            scalar_vectors[v] = [abs(k) for k in terms]
+
+    neg_points = [negate_affine(P) for P in points]
+
+    if w is None:
+        bits = max((s.bit_length() for scalars in scalar_vectors for s in scalars), default=0)
+        w = choose_window("pippenger", len(points), bits, signed)
+
+    digits = [digit_matrix(scalars, w, signed) for scalars in scalar_vectors]
+    max_windows = max((len(d) for d in digits), default=0)
+    num_buckets = num_buckets_for(w, signed)
+
+    results = [INF] * len(scalar_vectors)
+
+    # Process windows from MSB to LSB
+    for window_idx in reversed(range(max_windows)):
+        if window_idx != max_windows - 1:
+            results = [shift_window(R, w) for R in results]
+
+        rows = [d[window_idx] if window_idx < len(d) else None for d in digits]
+        buckets = build_buckets_batch(rows, points, neg_points, num_buckets, flips)
+
+        for v, vec_buckets in enumerate(buckets):
+            if rows[v] is not None:
+                results[v] = jacobian_add(results[v], reduce_buckets_pippenger(vec_buckets))
+
+    return batch_to_affine(results)
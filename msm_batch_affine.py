@@ -0,0 +1,183 @@
+from field import f_add, f_sub, f_mul, f_eq, f_batch_inv, p, INF
+from jacobian import (
+    jacobian_add,
+    jacobian_mixed_add
+)
+from msm_pippenger import (
+    split_scalar_windows,
+    split_scalar_windows_signed,
+    num_buckets_for,
+    negate_affine,
+    shift_window
+)
+from glv import glv_preprocess
+from autotune import choose_window
+
+
+# ------------------------------------------------------------
+# Affine additions sharing one inversion (Montgomery's trick)
+# ------------------------------------------------------------
+
+def batch_affine_add_pairs(pairs):
+    """
+    Add many independent affine pairs (P, Q) at once.
+    All slope denominators are inverted together with one f_inv,
+    so each addition costs ~6 field muls instead of one inversion.
+    Returns a list of affine points (None = infinity).
+    """
+    results = [None] * len(pairs)
+    slots = []
+    nums = []
+    dens = []
+
+    for k, (P, Q) in enumerate(pairs):
+        x1, y1 = P
+        x2, y2 = Q
+
+        if f_eq(x1, x2):
+            # P + (-P) = O
+            if (y1 + y2) % p == 0:
+                continue
+
+            # Doubling: slope = 3x^2 / 2y
+            x1_sq = f_mul(x1, x1)
+            nums.append(f_add(f_add(x1_sq, x1_sq), x1_sq))
+            dens.append(f_add(y1, y1))
+        else:
+            # General addition: slope = (y2 - y1) / (x2 - x1)
+            nums.append(f_sub(y2, y1))
+            dens.append(f_sub(x2, x1))
+
+        slots.append(k)
+
+    invs = f_batch_inv(dens)
+
+    for k, num, inv in zip(slots, nums, invs):
+        (x1, y1), (x2, _) = pairs[k]
+
+        m = f_mul(num, inv)
+        x3 = f_sub(f_sub(f_mul(m, m), x1), x2)
+        y3 = f_sub(f_mul(m, f_sub(x1, x3)), y1)
+
+        results[k] = (x3, y3)
+
+    return results
+
+
+# ------------------------------------------------------------
+# Build affine buckets for a single window
+# ------------------------------------------------------------
+
+def build_buckets_batch_affine(window_values, points, w, signed=False):
+    """
+    bucket[i] = sum of points whose window value == i
+    Buckets stay in affine form (None = empty).
+
+    Points are grouped per bucket, then reduced in rounds: every
+    round adds disjoint pairs inside each bucket, so all additions
+    of a round are independent and share a single inversion.
+    Number of rounds = ceil(log2(largest bucket)).
+    """
+    num_buckets = num_buckets_for(w, signed)
+
+    groups = {}
+    for idx, b in enumerate(window_values):
+        if b == 0:
+            continue
+        if b < 0:
+            groups.setdefault(-b, []).append(negate_affine(points[idx]))
+        else:
+            groups.setdefault(b, []).append(points[idx])
+
+    while True:
+        pairs = []
+        owners = []
+        for b, pts in groups.items():
+            for i in range(0, len(pts) - 1, 2):
+                pairs.append((pts[i], pts[i + 1]))
+                owners.append(b)
+
+        if not pairs:
+            break
+
+        sums = batch_affine_add_pairs(pairs)
+
+        # Odd point of each bucket waits for the next round
+        next_groups = {}
+        for b, pts in groups.items():
+            if len(pts) % 2:
+                next_groups[b] = [pts[-1]]
+
+        for b, S in zip(owners, sums):
+            if S is not None:
+                next_groups.setdefault(b, []).append(S)
+
+        groups = next_groups
+
+    buckets = [None] * num_buckets
+    for b, pts in groups.items():
+        if pts:
+            buckets[b] = pts[0]
+
+    return buckets
+
+
+# ------------------------------------------------------------
+# Reduce affine buckets with the Pippenger running sum
+# ------------------------------------------------------------
+
+def reduce_buckets_batch_affine(buckets):
+    """
+    Same running-sum reduction as Pippenger, but buckets are
+    affine so `running += bucket[i]` is a mixed addition.
+    """
+    running = INF
+    result = INF
+
+    for i in range(len(buckets) - 1, 0, -1):
+        if buckets[i] is not None:
+            running = jacobian_mixed_add(running, buckets[i])
+        result = jacobian_add(result, running)
+
+    return result
+
+
+# ------------------------------------------------------------
+# MSM with batch-affine bucket accumulation
+# ------------------------------------------------------------
+
+def msm_batch_affine(scalars, points, w=16, signed=False, glv=False):
+    """
+    Pippenger MSM where bucket building uses affine additions
+    with Montgomery batch inversion.
+    Result is returned in Jacobian form.
+    """
+    if glv:
+        scalars, points = glv_preprocess(scalars, points)
+
+    if w is None:
+        bits = max((s.bit_length() for s in scalars), default=0)
+        w = choose_window("batch_affine", len(scalars), bits, signed)
+
+    split = split_scalar_windows_signed if signed else split_scalar_windows
+    window_lists = [split(s, w) for s in scalars]
+    max_windows = max((len(ws) for ws in window_lists), default=0)
+
+    R = INF
+
+    for window_idx in reversed(range(max_windows)):
+        if window_idx != max_windows - 1:
+            R = shift_window(R, w)
+
+        window_vals = []
+        for ws in window_lists:
+            if window_idx < len(ws):
+                window_vals.append(ws[window_idx])
+            else:
+                window_vals.append(0)
+
+        buckets = build_buckets_batch_affine(window_vals, points, w, signed)
+        bucket_sum = reduce_buckets_batch_affine(buckets)
+        R = jacobian_add(R, bucket_sum)
+
+    return R
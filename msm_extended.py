@@ -1,6 +1,11 @@
 from extended_jacobian import (
-    to_extended, extended_mixed_add, extended_add, extended_double, EXT_INF
+    to_extended, extended_mixed_add, extended_add, extended_double_repeated, EXT_INF
 )
+from msm_pippenger import num_buckets_for
+from glv import glv_preprocess
+from autotune import choose_window
+from bucket_store import get_bucket_store, build_buckets_store, reduce_buckets_store
+from scalar_digits import digit_matrix, bucket_groups, accumulate_groups
 
 
 
@@ -13,24 +18,6 @@ def split_scalar_windows(s, w):
     return windows
 
 
-def build_buckets_extended(window_values, points, w):
-    num_buckets = 1 << w
-
-    buckets = [EXT_INF] * num_buckets
-
-    for idx, b in enumerate(window_values):
-        if b == 0:
-            continue
-        P_aff = points[idx]
-
-        if buckets[b][2] == 0:
-            buckets[b] = to_extended(P_aff)
-        else:
-            buckets[b] = extended_mixed_add(buckets[b], P_aff)
-
-    return buckets
-
-
 def reduce_buckets_extended(buckets):
     running = EXT_INF
     result = EXT_INF
@@ -45,14 +32,21 @@ def reduce_buckets_extended(buckets):
 
 
 def shift_window_extended(R, w):
-    for _ in range(w):
-        R = extended_double(R)
-    return R
+    return extended_double_repeated(R, w)
+
 
+def msm_extended(scalars, points, w=16, signed=False, glv=False, bucket_store=False):
+    if glv:
+        scalars, points = glv_preprocess(scalars, points)
 
-def msm_extended(scalars, points, w=16):
-    window_lists = [split_scalar_windows(s, w) for s in scalars]
-    max_windows = max(len(ws) for ws in window_lists)
+    if w is None:
+        bits = max((s.bit_length() for s in scalars), default=0)
+        w = choose_window("extended", len(scalars), bits, signed)
+
+    # All window digits at once (num_windows x N)
+    digits = digit_matrix(scalars, w, signed)
+    max_windows = len(digits)
+    num_buckets = num_buckets_for(w, signed)
 
     R = EXT_INF
 
@@ -60,15 +54,19 @@ def msm_extended(scalars, points, w=16):
         if window_idx != max_windows - 1:
             R = shift_window_extended(R, w)
 
-        window_vals = []
-        for ws in window_lists:
-            if window_idx < len(ws):
-                window_vals.append(ws[window_idx])
-            else:
-                window_vals.append(0)
+        window_vals = digits[window_idx]
 
-        buckets = build_buckets_extended(window_vals, points, w)
-        bucket_sum = reduce_buckets_extended(buckets)
+        if bucket_store:
+            store = get_bucket_store(num_buckets, "extended_jacobian")
+            build_buckets_store(window_vals, points, store, signed)
+            bucket_sum = reduce_buckets_store(store)
+        else:
+            buckets = [EXT_INF] * num_buckets
+            for b, B in accumulate_groups(
+                bucket_groups(window_vals), points, to_extended, extended_mixed_add
+            ):
+                buckets[b] = B
+            bucket_sum = reduce_buckets_extended(buckets)
         R = extended_add(R, bucket_sum)
 
-    return R
\ No newline at end of file
+    return R
\ No newline at end of file
@@ -0,0 +1,100 @@
+from field import INF
+from jacobian import jacobian_add
+from msm_pippenger import (
+    build_buckets_pippenger,
+    reduce_buckets_pippenger,
+    shift_window
+)
+from normalize import batch_to_affine
+
+
+# ------------------------------------------------------------
+# Prepared (fixed) bases
+# ------------------------------------------------------------
+
+class PreparedBases:
+    """
+    Precomputed shifts of a fixed point set, for many MSMs with
+    fresh scalars:
+
+        tables[t][i] = 2^(t * stride * w) * points[i]   (affine)
+
+    stride = 1 stores a table for every window, and the MSM needs
+    no doublings at all. stride = k keeps only every k-th shift:
+    memory drops to ceil(windows / k) * N points and the MSM pays
+    (k - 1) * w doublings.
+    """
+
+    def __init__(self, points, w=16, bits=256, stride=1):
+        if stride < 1:
+            raise ValueError("stride must be >= 1")
+
+        self.w = w
+        self.bits = bits
+        self.stride = stride
+        self.num_windows = (bits + w - 1) // w
+        self.num_tables = (self.num_windows + stride - 1) // stride
+
+        current = list(points)
+        self.tables = [current]
+
+        for _ in range(1, self.num_tables):
+            shifted = [shift_window((x, y, 1), stride * w) for (x, y) in current]
+            current = batch_to_affine(shifted)
+            self.tables.append(current)
+
+    def __len__(self):
+        return len(self.tables[0])
+
+    def stored_points(self):
+        """Number of affine points held in memory."""
+        return self.num_tables * len(self)
+
+
+# ------------------------------------------------------------
+# MSM over prepared bases
+# ------------------------------------------------------------
+
+def msm_fixed_base(scalars, prepared):
+    """
+    Multi-Scalar Multiplication against PreparedBases.
+
+    For every residue r < stride, the digits of windows
+    t * stride + r of all scalars go into ONE bucket pass over
+    the points of table t. With stride = 1 this is a single pass
+    and the result needs no shift_window.
+    """
+    if len(scalars) != len(prepared):
+        raise ValueError("scalars and prepared bases differ in length")
+
+    w = prepared.w
+    stride = prepared.stride
+    mask = (1 << w) - 1
+
+    for s in scalars:
+        if s.bit_length() > prepared.bits:
+            raise ValueError("scalar wider than prepared bit-length")
+
+    R = INF
+
+    for r in reversed(range(stride)):
+        if r != stride - 1:
+            R = shift_window(R, w)
+
+        window_vals = []
+        window_points = []
+        for t, table in enumerate(prepared.tables):
+            window_idx = t * stride + r
+            if window_idx >= prepared.num_windows:
+                continue
+
+            shift = window_idx * w
+            for s, P in zip(scalars, table):
+                window_vals.append((s >> shift) & mask)
+                window_points.append(P)
+
+        buckets = build_buckets_pippenger(window_vals, window_points, w)
+        bucket_sum = reduce_buckets_pippenger(buckets)
+        R = jacobian_add(R, bucket_sum)
+
+    return R
@@ -0,0 +1,119 @@
+from field import INF
+from jacobian import (
+    jacobian_add,
+    jacobian_neg,
+    jacobian_scalar_mul
+)
+from msm_pippenger import (
+    split_scalar_windows,
+    build_buckets_pippenger,
+    reduce_buckets_pippenger,
+    shift_window
+)
+
+
+# ------------------------------------------------------------
+# Incremental (delta) MSM with cached bucket state
+# ------------------------------------------------------------
+
+class IncrementalMSM:
+    """
+    Stateful MSM:  result = sum_i scalars[i] * points[i]
+
+    Keeps only the window sums S[j] = sum_i digit_j(s_i) * P_i; the
+    buckets are built once to derive them and then dropped. Changing
+    one scalar only touches the windows whose digit changed from a to
+    b: S[j] += (b - a) * P. The result is re-derived from the S[j]
+    (windows * w doublings), so no call costs anything proportional
+    to N after construction.
+
+    Note: unlike a per-window bucket cache, the 2^w buckets of each
+    window are not kept. result() only ever needs S[j], and keeping
+    S[j] directly makes an update O(windows) instead of paying for a
+    bucket move plus a full 2^w bucket reduction per touched window.
+    """
+
+    def __init__(self, scalars, points, w=16):
+        self.w = w
+        self.scalars = list(scalars)
+        self.points = list(points)
+
+        window_lists = [split_scalar_windows(s, w) for s in self.scalars]
+        num_windows = max((len(ws) for ws in window_lists), default=0)
+
+        self.window_sums = []
+        for window_idx in range(num_windows):
+            window_vals = [
+                ws[window_idx] if window_idx < len(ws) else 0
+                for ws in window_lists
+            ]
+            buckets = build_buckets_pippenger(window_vals, self.points, w)
+            self.window_sums.append(reduce_buckets_pippenger(buckets))
+
+        self._result = None
+
+    def __len__(self):
+        return len(self.scalars)
+
+    # --------------------------------------------------------
+    # Window-sum bookkeeping
+    # --------------------------------------------------------
+
+    def _move(self, window_idx, P_aff, old_digit, new_digit):
+        """P's digit in this window goes from old_digit to new_digit."""
+        delta = jacobian_scalar_mul(abs(new_digit - old_digit), (P_aff[0], P_aff[1], 1))
+        if new_digit < old_digit:
+            delta = jacobian_neg(delta)
+        self.window_sums[window_idx] = jacobian_add(self.window_sums[window_idx], delta)
+
+    def _change(self, P_aff, old_scalar, new_scalar):
+        old_ws = split_scalar_windows(old_scalar, self.w)
+        new_ws = split_scalar_windows(new_scalar, self.w)
+
+        while len(self.window_sums) < len(new_ws):
+            self.window_sums.append(INF)
+
+        for window_idx in range(max(len(old_ws), len(new_ws))):
+            a = old_ws[window_idx] if window_idx < len(old_ws) else 0
+            b = new_ws[window_idx] if window_idx < len(new_ws) else 0
+            if a != b:
+                self._move(window_idx, P_aff, a, b)
+
+        self._result = None
+
+    # --------------------------------------------------------
+    # Public updates
+    # --------------------------------------------------------
+
+    def update(self, index, new_scalar):
+        old_scalar = self.scalars[index]
+        self.scalars[index] = new_scalar
+        self._change(self.points[index], old_scalar, new_scalar)
+
+    def append(self, scalar, point):
+        self.scalars.append(scalar)
+        self.points.append(point)
+        self._change(point, 0, scalar)
+
+    def remove(self, index):
+        """Drop term `index`; later indices shift down like list.pop."""
+        scalar = self.scalars.pop(index)
+        point = self.points.pop(index)
+        self._change(point, scalar, 0)
+
+    # --------------------------------------------------------
+    # Result
+    # --------------------------------------------------------
+
+    def result(self):
+        """Current MSM value in Jacobian form."""
+        if self._result is None:
+            R = INF
+            num_windows = len(self.window_sums)
+            for window_idx in reversed(range(num_windows)):
+                if window_idx != num_windows - 1:
+                    R = shift_window(R, self.w)
+                R = jacobian_add(R, self.window_sums[window_idx])
+            self._result = R
+
+        return self._result
@@ -0,0 +1,211 @@
+import numpy as np
+
+from field import INF
+from field_numpy import (
+    to_limbs,
+    from_limbs,
+    v_zeros,
+    v_const,
+    v_add,
+    v_sub,
+    v_neg,
+    v_mul,
+    v_sqr,
+    v_is_zero
+)
+from jacobian import jacobian_add, jacobian_mixed_add
+from msm_pippenger import (
+    split_scalar_windows,
+    split_scalar_windows_signed,
+    num_buckets_for,
+    reduce_buckets_pippenger,
+    shift_window
+)
+from autotune import choose_window
+
+
+# ------------------------------------------------------------
+# Vectorized mixed addition  (Jacobian P + affine Q, per lane)
+# ------------------------------------------------------------
+
+def v_jacobian_mixed_add(X1, Y1, Z1, x2, y2):
+    """
+    Same formula as jacobian_mixed_add, over whole limb arrays.
+    Returns (X3, Y3, Z3, special) where `special` marks lanes with
+    U2 == X1 (doubling or P + (-P)); those lanes must be redone
+    with the scalar formula.
+    """
+    Z1_sq = v_sqr(Z1)
+    U2 = v_mul(x2, Z1_sq)
+    Z1_cu = v_mul(Z1_sq, Z1)
+    S2 = v_mul(y2, Z1_cu)
+
+    H = v_sub(U2, X1)
+    R = v_sub(S2, Y1)
+    special = v_is_zero(H)
+
+    H_sq = v_sqr(H)
+    H_cu = v_mul(H_sq, H)
+    X1_H_sq = v_mul(X1, H_sq)
+
+    X3 = v_sub(v_sub(v_sqr(R), H_cu), v_add(X1_H_sq, X1_H_sq))
+    Y3 = v_sub(v_mul(R, v_sub(X1_H_sq, X3)), v_mul(Y1, H_cu))
+    Z3 = v_mul(Z1, H)
+
+    return X3, Y3, Z3, special
+
+
+# ------------------------------------------------------------
+# Bucket building: one vector mixed add per round
+# ------------------------------------------------------------
+
+def _bucket_rounds(window_rows, num_buckets):
+    """
+    Flatten the digits of all windows into global bucket ids
+    (window * num_buckets + |digit|) and order them into rounds:
+    round r holds the r-th point of every bucket, so the buckets
+    inside a round are distinct.
+    Returns (bucket ids, negative flags, point indices, round sizes).
+    """
+    vals = np.asarray(window_rows, dtype=np.int64)
+    win, idx = np.nonzero(vals)
+    digits = vals[win, idx]
+    ids = win * num_buckets + np.abs(digits)
+
+    order = np.argsort(ids, kind="stable")
+    ids = ids[order]
+    neg = digits[order] < 0
+    idx = idx[order]
+
+    # Rank of each entry inside its bucket
+    pos = np.arange(len(ids))
+    first = np.ones(len(ids), dtype=bool)
+    first[1:] = ids[1:] != ids[:-1]
+    rank = pos - np.maximum.accumulate(np.where(first, pos, 0))
+
+    by_round = np.argsort(rank, kind="stable")
+    counts = np.bincount(rank)
+
+    return ids[by_round], neg[by_round], idx[by_round], counts
+
+
+def build_buckets_numpy(window_rows, px, py, py_neg, w, signed=False):
+    """
+    Buckets of ALL windows at once:
+        buckets[j][i] = sum of points whose digit in window j == i
+    Every bucket of every window is an independent lane, so one
+    round is a single vector mixed add over up to
+    (#windows * #buckets) lanes.
+    Points come as limb arrays (px, py, and -py for signed digits).
+    Buckets are returned in Jacobian form, like build_buckets_pippenger.
+    """
+    num_buckets = num_buckets_for(w, signed)
+    total = len(window_rows) * num_buckets
+
+    BX = v_zeros(total)
+    BY = v_zeros(total)
+    BZ = v_zeros(total)
+    occupied = np.zeros(total, dtype=bool)
+
+    ids, neg, pidx, counts = _bucket_rounds(window_rows, num_buckets)
+
+    start = 0
+    for r, count in enumerate(counts):
+        sl = slice(start, start + count)
+        start += count
+
+        b = ids[sl]
+        pi = pidx[sl]
+
+        x2 = px[:, pi]
+        y2 = np.where(neg[sl], py_neg[:, pi], py[:, pi])
+        one = v_const(1, count)
+
+        if r == 0:
+            # First contribution: affine -> Jacobian
+            BX[:, b] = x2
+            BY[:, b] = y2
+            BZ[:, b] = one
+            occupied[b] = True
+            continue
+
+        X1 = BX[:, b]
+        Y1 = BY[:, b]
+        Z1 = BZ[:, b]
+
+        # A bucket emptied by P + (-P) restarts from the new point
+        empty = ~occupied[b]
+
+        X3, Y3, Z3, special = v_jacobian_mixed_add(X1, Y1, Z1, x2, y2)
+
+        X3 = np.where(empty, x2, X3)
+        Y3 = np.where(empty, y2, Y3)
+        Z3 = np.where(empty, one, Z3)
+        occupied[b] = True
+
+        # Doubling / cancellation lanes: scalar formula
+        for lane in np.nonzero(special & ~empty)[0]:
+            P = tuple(from_limbs(a[:, [lane]])[0] for a in (X1, Y1, Z1))
+            Q = (from_limbs(x2[:, [lane]])[0], from_limbs(y2[:, [lane]])[0])
+            S = jacobian_mixed_add(P, Q)
+            if S[2] == 0:
+                occupied[b[lane]] = False
+                S = (0, 0, 0)
+            X3[:, lane], Y3[:, lane], Z3[:, lane] = to_limbs(S).T
+
+        BX[:, b] = X3
+        BY[:, b] = Y3
+        BZ[:, b] = Z3
+
+    xs = from_limbs(BX)
+    ys = from_limbs(BY)
+    zs = from_limbs(BZ)
+
+    flat = [
+        (xs[i], ys[i], zs[i]) if occupied[i] else INF
+        for i in range(total)
+    ]
+    return [flat[j:j + num_buckets] for j in range(0, total, num_buckets)]
+
+
+# ------------------------------------------------------------
+# MSM with vectorized bucket building
+# ------------------------------------------------------------
+
+def msm_numpy(scalars, points, w=16, signed=False):
+    """
+    Pippenger MSM with bucket building on the NumPy limb backend.
+    Points are converted to limbs once; the buckets of every window
+    are built together, then reduced window by window (scalar).
+    w=None picks the window size with the autotuner cost model.
+    """
+    if w is None:
+        bits = max((s.bit_length() for s in scalars), default=0)
+        w = choose_window("pippenger", len(scalars), bits, signed)
+
+    split = split_scalar_windows_signed if signed else split_scalar_windows
+    window_lists = [split(s, w) for s in scalars]
+    max_windows = max((len(ws) for ws in window_lists), default=0)
+    if max_windows == 0:
+        return INF
+
+    px = to_limbs([P[0] for P in points])
+    py = to_limbs([P[1] for P in points])
+    py_neg = v_neg(py) if signed else py
+
+    window_rows = [
+        [ws[window_idx] if window_idx < len(ws) else 0 for ws in window_lists]
+        for window_idx in range(max_windows)
+    ]
+    all_buckets = build_buckets_numpy(window_rows, px, py, py_neg, w, signed)
+
+    R = INF
+
+    for window_idx in reversed(range(max_windows)):
+        if window_idx != max_windows - 1:
+            R = shift_window(R, w)
+
+        bucket_sum = reduce_buckets_pippenger(all_buckets[window_idx])
+        R = jacobian_add(R, bucket_sum)
+
+    return R
@@ -0,0 +1,189 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from field import INF
+from jacobian import jacobian_add
+from msm_pippenger import (
+    split_scalar_windows_signed,
+    build_buckets_pippenger,
+    reduce_buckets_pippenger,
+    shift_window
+)
+
+# Every scalar / coordinate is stored as 32 little-endian bytes.
+# Record i = scalar_i | x_i | y_i
+COORD_BYTES = 32
+RECORD_BYTES = 3 * COORD_BYTES
+
+
+# ------------------------------------------------------------
+# Shared-memory packing of (scalar, point) records
+# ------------------------------------------------------------
+
+def pack_records(scalars, points, buf):
+    """Write scalars and affine points into `buf` (RECORD_BYTES each)."""
+    offset = 0
+    for s, (x, y) in zip(scalars, points):
+        buf[offset:offset + COORD_BYTES] = s.to_bytes(COORD_BYTES, "little")
+        offset += COORD_BYTES
+        buf[offset:offset + COORD_BYTES] = x.to_bytes(COORD_BYTES, "little")
+        offset += COORD_BYTES
+        buf[offset:offset + COORD_BYTES] = y.to_bytes(COORD_BYTES, "little")
+        offset += COORD_BYTES
+
+
+def unpack_records(buf, count):
+    """Inverse of pack_records -> (scalars, points)."""
+    scalars = []
+    points = []
+    offset = 0
+    for _ in range(count):
+        s = int.from_bytes(buf[offset:offset + COORD_BYTES], "little")
+        offset += COORD_BYTES
+        x = int.from_bytes(buf[offset:offset + COORD_BYTES], "little")
+        offset += COORD_BYTES
+        y = int.from_bytes(buf[offset:offset + COORD_BYTES], "little")
+        offset += COORD_BYTES
+        scalars.append(s)
+        points.append((x, y))
+    return scalars, points
+
+
+# ------------------------------------------------------------
+# Worker side
+# ------------------------------------------------------------
+
+# Records of the current call, decoded once per worker process
+_worker_shm_name = None
+_worker_scalars = None
+_worker_points = None
+_worker_signed_windows = None
+
+
+def _load_records(shm_name, count):
+    global _worker_shm_name, _worker_scalars, _worker_points, _worker_signed_windows
+
+    if shm_name == _worker_shm_name:
+        return
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        _worker_scalars, _worker_points = unpack_records(shm.buf, count)
+    finally:
+        shm.close()
+
+    _worker_shm_name = shm_name
+    _worker_signed_windows = None
+
+
+def _window_task(shm_name, count, window_idx, w, signed):
+    """Bucket build + reduction for one window, independent of the others."""
+    global _worker_signed_windows
+
+    _load_records(shm_name, count)
+
+    if signed:
+        # Signed digits carry between windows: split every scalar once
+        if _worker_signed_windows is None:
+            _worker_signed_windows = [
+                split_scalar_windows_signed(s, w) for s in _worker_scalars
+            ]
+        window_vals = [
+            ws[window_idx] if window_idx < len(ws) else 0
+            for ws in _worker_signed_windows
+        ]
+    else:
+        shift = window_idx * w
+        mask = (1 << w) - 1
+        window_vals = [(s >> shift) & mask for s in _worker_scalars]
+
+    buckets = build_buckets_pippenger(window_vals, _worker_points, w, signed)
+    return reduce_buckets_pippenger(buckets)
+
+
+# ------------------------------------------------------------
+# Shared process pool
+# ------------------------------------------------------------
+
+_pool = None
+_pool_workers = 0
+
+
+def get_pool(workers=None):
+    """
+    Process pool shared across calls; workers=None is one process
+    per core. Asking for a different size replaces the pool.
+    """
+    global _pool, _pool_workers
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, workers)
+
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+# ------------------------------------------------------------
+# MSM Pippenger, one process per window
+# ------------------------------------------------------------
+
+def msm_pippenger_parallel(scalars, points, w=16, signed=False, workers=None, pool=None):
+    """
+    Pippenger MSM with windows evaluated in a process pool.
+
+    - scalars/points are packed once into shared memory; each worker
+      decodes them a single time per call instead of receiving them
+      per task
+    - every window's bucket build + reduction is an independent task
+    - window sums are combined afterwards with the usual doublings
+    - pool: executor to run the windows on; None uses the module's
+      shared pool (get_pool(workers)), so worker processes are
+      started once, not per call
+
+    Operation counters of the worker processes are not collected.
+    """
+    count = len(scalars)
+    bits = max((s.bit_length() for s in scalars), default=0)
+    num_windows = (bits + w - 1) // w
+
+    if num_windows == 0:
+        return INF
+
+    if signed:
+        # Balanced digits fit in num_windows windows unless the
+        # scalar exceeds 2^(w-1) * (1 + 2^w + ... + 2^(w*(num_windows-1)))
+        top = (1 << (w - 1)) * ((1 << (w * num_windows)) - 1) // ((1 << w) - 1)
+        if max(scalars) > top:
+            # Room for the final carry
+            num_windows += 1
+
+    if pool is None:
+        pool = get_pool(workers)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, count * RECORD_BYTES))
+    try:
+        pack_records(scalars, points, shm.buf)
+
+        futures = [
+            pool.submit(_window_task, shm.name, count, window_idx, w, signed)
+            for window_idx in range(num_windows)
+        ]
+        window_sums = [f.result() for f in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Combine windows from MSB to LSB
+    R = INF
+    for window_idx in reversed(range(num_windows)):
+        if window_idx != num_windows - 1:
+            R = shift_window(R, w)
+        R = jacobian_add(R, window_sums[window_idx])
+
+    return R
@@ -1,8 +1,15 @@
-from field import INF
+import math
+
+from field import INF, f_neg
+from glv import glv_preprocess
+from autotune import choose_window
+from bucket_store import get_bucket_store, build_buckets_store, reduce_buckets_store
+from scalar_digits import digit_matrix, bucket_groups, accumulate_groups
 from jacobian import (
     jacobian_add,
-    jacobian_double,
-    jacobian_mixed_add
+    jacobian_double_repeated,
+    jacobian_mixed_add,
+    jacobian_scalar_mul
 )
 
 # ------------------------------------------------------------
@@ -24,24 +31,78 @@ def split_scalar_windows(s, w):
     return windows
 
 
+# ------------------------------------------------------------
+# Split scalar into signed (balanced) windows (LSB first)
+# ------------------------------------------------------------
+
+def split_scalar_windows_signed(s, w):
+    """
+    Split scalar s into signed windows of size w bits.
+    Digits lie in [-2^(w-1)+1, 2^(w-1)]: a digit above 2^(w-1)
+    is replaced by digit - 2^w and carries 1 into the next window.
+    windows[0] = LSB window
+    """
+    windows = []
+    mask = (1 << w) - 1
+    half = 1 << (w - 1)
+    carry = 0
+
+    while s > 0 or carry:
+        d = (s & mask) + carry
+        s >>= w
+
+        if d > half:
+            d -= 1 << w
+            carry = 1
+        else:
+            carry = 0
+
+        windows.append(d)
+
+    return windows
+
+
+def num_buckets_for(w, signed=False):
+    """
+    Bucket array size per window (bucket 0 is never used).
+    Signed digits only need |digit| <= 2^(w-1).
+    """
+    if signed:
+        return (1 << (w - 1)) + 1
+    return 1 << w
+
+
+def negate_affine(P_aff):
+    return (P_aff[0], f_neg(P_aff[1]))
+
+
+def _to_jacobian(P_aff):
+    return (P_aff[0], P_aff[1], 1)
+
+
 # ------------------------------------------------------------
 # Build buckets for a single window (same as reference)
 # ------------------------------------------------------------
 
-def build_buckets_pippenger(window_values, points, w):
+def build_buckets_pippenger(window_values, points, w, signed=False, buckets=None):
     """
     bucket[i] = sum of points whose window value == i
     Points are given in affine form.
     Buckets are stored in Jacobian.
+    With signed digits, a negative value -i adds -P into bucket[i].
+    An existing `buckets` list is accumulated into in place.
     """
-    num_buckets = 1 << w
-    buckets = [INF] * num_buckets
+    if buckets is None:
+        buckets = [INF] * num_buckets_for(w, signed)
 
     for idx, b in enumerate(window_values):
         if b == 0:
             continue
 
         P_aff = points[idx]
+        if b < 0:
+            b = -b
+            P_aff = negate_affine(P_aff)
 
         if buckets[b] == INF:
             buckets[b] = (P_aff[0], P_aff[1], 1)
@@ -74,32 +135,94 @@ def reduce_buckets_pippenger(buckets):
     return result
 
 
+# ------------------------------------------------------------
+# Sparse buckets (N much smaller than 2^w)
+# ------------------------------------------------------------
+
+def reduce_buckets_sparse(buckets):
+    """
+    sum_i i * bucket[i] over the occupied indices only.
+    With i_1 > i_2 > ... > i_m (and i_(m+1) = 0):
+        running_k = bucket[i_1] + ... + bucket[i_k]
+        result    = sum_k (i_k - i_(k+1)) * running_k
+    Each gap is one small scalar multiplication instead of
+    (gap) running-sum steps.
+    """
+    order = sorted(buckets, reverse=True)
+
+    running = INF
+    result = INF
+
+    for k, i in enumerate(order):
+        running = jacobian_add(running, buckets[i])
+        nxt = order[k + 1] if k + 1 < len(order) else 0
+        result = jacobian_add(result, jacobian_scalar_mul(i - nxt, running))
+
+    return result
+
+
+def sparse_pays_off(occupied, num_buckets):
+    """
+    Running-sum reduction costs ~2 adds per bucket; the sparse one
+    ~2 adds + ~1.5 * log2(gap) double/add steps per occupied bucket.
+    """
+    if occupied == 0:
+        return True
+    gap = (num_buckets - 1) / occupied
+    return occupied * (2 + 1.5 * math.log2(max(gap, 1))) < 2 * (num_buckets - 1)
+
+
+def densify_buckets(buckets, num_buckets):
+    dense = [INF] * num_buckets
+    for b, B in buckets.items():
+        dense[b] = B
+    return dense
+
+
 # ------------------------------------------------------------
 # Shift accumulated result by w bits (w doublings)
 # ------------------------------------------------------------
 
 def shift_window(R, w):
-    for _ in range(w):
-        R = jacobian_double(R)
-    return R
+    return jacobian_double_repeated(R, w)
 
 
 # ------------------------------------------------------------
 # MSM Pippenger (Fast)
 # ------------------------------------------------------------
 
-def msm_pippenger(scalars, points, w=16):
+def msm_pippenger(scalars, points, w=16, signed=False, glv=False, bucket_store=False,
+                  sparse=None):
     """
     Fast Multi-Scalar Multiplication using Pippenger algorithm.
 
     - Same windowing as reference
     - Same bucket building
     - Different (cheap) bucket reduction
+    - signed=True uses balanced digits (half the buckets per window)
+    - glv=True splits every scalar with the secp256k1 endomorphism
+      (2N points, ~128-bit scalars -> half the windows and doublings)
+    - w=None picks the window size with the autotuner cost model
+    - bucket_store=True keeps buckets in a reused BucketStore
+    - sparse=None (auto) stores only occupied buckets when N < #buckets
+      and reduces them sparsely whenever the occupancy makes it cheaper;
+      True / False force the sparse / dense path
     """
 
-    # Split scalars into windows
-    window_lists = [split_scalar_windows(s, w) for s in scalars]
-    max_windows = max(len(ws) for ws in window_lists)
+    if glv:
+        scalars, points = glv_preprocess(scalars, points)
+
+    if w is None:
+        bits = max((s.bit_length() for s in scalars), default=0)
+        w = choose_window("pippenger", len(scalars), bits, signed)
+
+    # All window digits at once (num_windows x N)
+    digits = digit_matrix(scalars, w, signed)
+    max_windows = len(digits)
+
+    num_buckets = num_buckets_for(w, signed)
+    if sparse is None:
+        sparse = len(points) < num_buckets
 
     R = INF
 
@@ -110,19 +233,31 @@ def msm_pippenger(scalars, points, w=16):
         if window_idx != max_windows - 1:
             R = shift_window(R, w)
 
-        # Collect window values for this window
-        window_vals = []
-        for ws in window_lists:
-            if window_idx < len(ws):
-                window_vals.append(ws[window_idx])
-            else:
-                window_vals.append(0)
+        window_vals = digits[window_idx]
 
-        # Build buckets
-        buckets = build_buckets_pippenger(window_vals, points, w)
+        if bucket_store:
+            store = get_bucket_store(num_buckets)
+            build_buckets_store(window_vals, points, store, signed)
+            bucket_sum = reduce_buckets_store(store)
+        else:
+            # Build buckets from the per-bucket index groups
+            occupied = accumulate_groups(
+                bucket_groups(window_vals), points, _to_jacobian, jacobian_mixed_add
+            )
+
+            if sparse:
+                buckets = {b: B for b, B in occupied if B[2] != 0}
+                if sparse_pays_off(len(buckets), num_buckets):
+                    bucket_sum = reduce_buckets_sparse(buckets)
+                else:
+                    bucket_sum = reduce_buckets_pippenger(densify_buckets(buckets, num_buckets))
+            else:
+                buckets = [INF] * num_buckets
+                for b, B in occupied:
+                    buckets[b] = B
 
-        # Reduce buckets (Pippenger)
-        bucket_sum = reduce_buckets_pippenger(buckets)
+                # Reduce buckets (Pippenger)
+                bucket_sum = reduce_buckets_pippenger(buckets)
 
         # Accumulate
         R = jacobian_add(R, bucket_sum)
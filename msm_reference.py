@@ -4,6 +4,7 @@ from jacobian import (
     jacobian_double,
     jacobian_mixed_add
 )
+from scalar_digits import digit_matrix, bucket_groups, accumulate_groups
 
 # ------------------------------------------------------------
 # Split scalar into windows (LSB first)
@@ -24,35 +25,6 @@ def split_scalar_windows(s, w):
     return windows
 
 
-# ------------------------------------------------------------
-# Build buckets for a single window (Reference version)
-# ------------------------------------------------------------
-
-def build_buckets_reference(window_values, points, w):
-    """
-    bucket[i] = sum of points whose window value == i
-    Points are given in affine form.
-    Buckets are stored in Jacobian.
-    """
-    num_buckets = 1 << w
-    buckets = [INF] * num_buckets
-
-    for idx, b in enumerate(window_values):
-        if b == 0:
-            continue
-
-        P_aff = points[idx]
-
-        # First contribution → affine → Jacobian
-        if buckets[b] == INF:
-            buckets[b] = (P_aff[0], P_aff[1], 1)
-        else:
-            # Mixed add: Jacobian + Affine
-            buckets[b] = jacobian_mixed_add(buckets[b], P_aff)
-
-    return buckets
-
-
 # ------------------------------------------------------------
 # Reduce buckets with explicit weights (Golden)
 # ------------------------------------------------------------
@@ -102,9 +74,9 @@ def msm_reference(scalars, points, w=16):
     - Uses explicit weights (slow but correct)
     """
 
-    # Split scalars into windows
-    window_lists = [split_scalar_windows(s, w) for s in scalars]
-    max_windows = max(len(ws) for ws in window_lists)
+    # All window digits at once (num_windows x N)
+    digits = digit_matrix(scalars, w)
+    max_windows = len(digits)
 
     R = INF
 
@@ -115,16 +87,13 @@ def msm_reference(scalars, points, w=16):
         if window_idx != max_windows - 1:
             R = shift_window(R, w)
 
-        # Collect window values for this window
-        window_vals = []
-        for ws in window_lists:
-            if window_idx < len(ws):
-                window_vals.append(ws[window_idx])
-            else:
-                window_vals.append(0)
-
-        # Build buckets
-        buckets = build_buckets_reference(window_vals, points, w)
+        # Build buckets from the per-bucket index groups
+        buckets = [INF] * (1 << w)
+        groups = bucket_groups(digits[window_idx])
+        for b, B in accumulate_groups(
+            groups, points, lambda P_aff: (P_aff[0], P_aff[1], 1), jacobian_mixed_add
+        ):
+            buckets[b] = B
 
         # Reduce buckets (explicit weights)
         bucket_sum = reduce_buckets_reference(buckets)
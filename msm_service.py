@@ -0,0 +1,355 @@
+# ==========================================================
+#   asyncio MSM service: queued, coalesced msm_batch passes
+# ==========================================================
+#
+# Many small MSMs against the same registered point set are cheaper
+# as one msm_batch pass (the points are walked once per window for
+# all scalar vectors). MSMService queues incoming requests, waits up
+# to `batch_window` seconds for more to arrive, groups the queue by
+# point set and runs one msm_batch per group in an executor, so the
+# event loop keeps serving while a batch is computed.
+#
+#   service = MSMService(batch_window=0.005, queue_depth=1024)
+#   service.register("g", points)
+#   R = await service.msm("g", scalars)        # affine (x, y) / None
+#
+# Over a Unix socket (newline-delimited JSON, one object per line):
+#   {"id": 1, "op": "register", "set": "g", "points": [[x, y], ...]}
+#   {"id": 2, "op": "msm", "set": "g", "scalars": [s0, s1, ...]}
+#   -> {"id": 2, "result": [x, y]}   (null = infinity)
+#   -> {"id": 2, "error": "..."}
+# Requests on one connection are handled concurrently; replies carry
+# the request id and may come back out of order.
+#
+#   python msm_service.py --socket /tmp/msm.sock --n 1000
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from msm_batch import msm_batch
+
+
+class ServiceBusy(RuntimeError):
+    """The request queue is full (queue_depth requests pending)."""
+
+
+# ------------------------------------------------------------
+# Service
+# ------------------------------------------------------------
+
+class MSMService:
+    """
+    - batch_window: seconds to wait after the first queued request
+      for others to join its batch
+    - max_batch: most requests taken into one batch pass
+    - queue_depth: pending requests allowed; beyond that msm()
+      raises ServiceBusy
+    - executor: where msm_batch runs (default: one worker thread).
+      A ProcessPoolExecutor takes the work off the event loop's
+      interpreter, at the price of pickling the points per batch.
+    - w / signed / glv are passed to msm_batch (w=None: autotuned)
+    """
+
+    def __init__(self, batch_window=0.005, max_batch=256, queue_depth=1024,
+                 executor=None, w=None, signed=False, glv=False):
+        if batch_window < 0 or max_batch < 1 or queue_depth < 1:
+            raise ValueError("need batch_window >= 0, max_batch >= 1, queue_depth >= 1")
+
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.queue_depth = queue_depth
+        self.w = w
+        self.signed = signed
+        self.glv = glv
+
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+
+        self.point_sets = {}
+        self.stats = {"requests": 0, "batches": 0, "largest_batch": 0, "rejected": 0}
+
+        self._queue = []       # (points, scalars, future)
+        self._wakeup = None    # asyncio.Event, created on the running loop
+        self._dispatcher = None
+
+    # --------------------------------------------------------
+
+    def register(self, name, points):
+        """Make `points` (affine list) available as point set `name`."""
+        self.point_sets[name] = [tuple(P) for P in points]
+
+    async def msm(self, name, scalars):
+        """
+        sum_i scalars[i] * points[i] over point set `name`, affine
+        (None = infinity). Shorter scalar lists use the first
+        len(scalars) points. The request is bound to the point set
+        registered under `name` now; re-registering it later does not
+        affect queued requests.
+        """
+        points = self.point_sets.get(name)
+        if points is None:
+            raise KeyError(f"unknown point set: {name}")
+        scalars = [int(s) for s in scalars]
+        if len(scalars) > len(points):
+            raise ValueError(f"{len(scalars)} scalars for {len(points)} points")
+        if any(s < 0 for s in scalars):
+            raise ValueError("scalars must be >= 0")
+        if len(self._queue) >= self.queue_depth:
+            self.stats["rejected"] += 1
+            raise ServiceBusy(f"queue full ({self.queue_depth} pending)")
+
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((points, scalars, future))
+        self.stats["requests"] += 1
+        self._wakeup.set()
+        return await future
+
+    # --------------------------------------------------------
+
+    def _start(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            if self.batch_window and len(self._queue) < self.max_batch:
+                await asyncio.sleep(self.batch_window)
+
+            batch = self._queue[:self.max_batch]
+            del self._queue[:self.max_batch]
+            if not self._queue:
+                self._wakeup.clear()
+
+            # Group by the point list each request was queued against
+            groups = {}
+            for points, scalars, future in batch:
+                if not future.cancelled():
+                    groups.setdefault(id(points), (points, []))[1].append((scalars, future))
+
+            try:
+                for points, requests in groups.values():
+                    await self._run_group(loop, points, requests)
+            except asyncio.CancelledError:
+                # Groups of this batch not started yet
+                for _, _, future in batch:
+                    future.cancel()
+                raise
+
+    async def _run_group(self, loop, points, requests):
+        n = len(points)
+        vectors = [scalars + [0] * (n - len(scalars)) for scalars, _ in requests]
+
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(requests))
+        try:
+            results = await loop.run_in_executor(
+                self.executor, msm_batch, vectors, points, self.w, self.signed, self.glv
+            )
+        except asyncio.CancelledError:
+            # close() while the batch is in flight
+            for _, future in requests:
+                future.cancel()
+            raise
+        except Exception as exc:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future), R in zip(requests, results):
+            if not future.done():
+                future.set_result(R)
+
+    async def close(self):
+        """Stop the dispatcher; queued and in-flight requests are cancelled."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        for _, _, future in self._queue:
+            future.cancel()
+        self._queue.clear()
+        if self._own_executor:
+            self.executor.shutdown(wait=False)
+
+
+# ------------------------------------------------------------
+# Unix-socket front-end
+# ------------------------------------------------------------
+
+async def _handle_request(service, message, writer):
+    reply = {"id": message.get("id")}
+    try:
+        op = message.get("op")
+        if op == "msm":
+            R = await service.msm(message["set"], message["scalars"])
+            reply["result"] = None if R is None else list(R)
+        elif op == "register":
+            service.register(message["set"], message["points"])
+            reply["result"] = len(message["points"])
+        elif op == "ping":
+            reply["result"] = "pong"
+        else:
+            raise ValueError(f"unknown op: {op}")
+    except Exception as exc:
+        reply["error"] = f"{type(exc).__name__}: {exc}"
+
+    writer.write((json.dumps(reply) + "\n").encode())
+    await writer.drain()
+
+
+async def _handle_connection(service, reader, writer):
+    pending = set()
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # The line outgrew the stream limit and the connection
+                # cannot be resynchronised. Half-close after the reply and
+                # discard input until the peer hangs up: closing with its
+                # unread tail still queued would reset the connection and
+                # could drop the reply before the client reads it.
+                reply = {"id": None, "error": "request too large"}
+                writer.write((json.dumps(reply) + "\n").encode())
+                if writer.can_write_eof():
+                    writer.write_eof()
+                while await reader.read(1 << 16):
+                    pass
+                break
+            if not line:
+                break
+            try:
+                message = json.loads(line)
+                if not isinstance(message, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as exc:
+                reply = {"id": None, "error": f"bad request: {exc}"}
+                writer.write((json.dumps(reply) + "\n").encode())
+                continue
+            task = asyncio.create_task(_handle_request(service, message, writer))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_unix(service, path):
+    """Start serving `service` on the Unix socket `path` -> asyncio.Server."""
+    if os.path.exists(path):
+        os.unlink(path)
+    return await asyncio.start_unix_server(
+        lambda r, w: _handle_connection(service, r, w), path=path,
+        limit=1 << 24,
+    )
+
+
+class MSMClient:
+    """Async client for serve_unix; requests may be issued concurrently."""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._waiting = {}
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, path):
+        reader, writer = await asyncio.open_unix_connection(path, limit=1 << 24)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        try:
+            while line := await self._reader.readline():
+                reply = json.loads(line)
+                future = self._waiting.pop(reply.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in reply:
+                    future.set_exception(RuntimeError(reply["error"]))
+                else:
+                    future.set_result(reply["result"])
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("service closed the connection"))
+            self._waiting.clear()
+
+    async def request(self, op, **fields):
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[self._next_id] = future
+        self._writer.write((json.dumps({"id": self._next_id, "op": op, **fields}) + "\n").encode())
+        await self._writer.drain()
+        return await future
+
+    async def register(self, name, points):
+        return await self.request("register", set=name, points=[list(P) for P in points])
+
+    async def msm(self, name, scalars):
+        R = await self.request("msm", set=name, scalars=list(scalars))
+        return None if R is None else tuple(R)
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._receiver.cancel()
+        try:
+            await self._receiver
+        except asyncio.CancelledError:
+            pass
+
+
+# ------------------------------------------------------------
+# Command line
+# ------------------------------------------------------------
+
+async def _serve_forever(args):
+    from fixtures import generate_points
+
+    service = MSMService(args.window, args.max_batch, args.queue_depth, w=args.w)
+    service.register("default", generate_points(args.n))
+    server = await serve_unix(service, args.socket)
+    print(f"Serving {args.n} points as 'default' on {args.socket}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="asyncio MSM service")
+    parser.add_argument("--socket", default="/tmp/msm.sock")
+    parser.add_argument("--n", type=int, default=1000, help="points in the 'default' set")
+    parser.add_argument("--w", type=int, default=None)
+    parser.add_argument("--window", type=float, default=0.005,
+                        help="batching window in seconds")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--queue-depth", type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_serve_forever(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
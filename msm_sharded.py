@@ -0,0 +1,419 @@
+# ==========================================================
+#   Sharded MSM: coordinator + socket-connected workers
+# ==========================================================
+#
+# The coordinator splits (scalars, points) into contiguous shards
+# and sends each one to a worker over multiprocessing.connection
+# (TCP, authenticated with a shared key). A worker runs
+# msm_pippenger on its shard and replies with the Jacobian partial
+# sum, which the coordinator adds up.
+#
+#   with start_local_workers(4) as workers:
+#       timings = []
+#       R = msm_sharded(scalars, points, workers.addresses, w=12,
+#                       authkey=workers.authkey, timings=timings)
+#
+# Workers on other hosts (the key is required; pick a long random
+# one and share it with the coordinator out of band):
+#   MSM_SHARD_AUTHKEY=<key> python msm_sharded.py worker --host <interface ip> --port 6000
+#   R = msm_sharded(scalars, points, [("10.0.0.5", 6000)], authkey=<key>)
+#
+# Messages are pickled, so whoever knows the key can run code on the
+# worker: never expose a worker beyond hosts that may hold the key.
+#
+# A shard whose worker fails (connection lost, timeout, error reply)
+# is queued again and retried on any live worker, up to `retries`
+# extra attempts. A worker that fails is dropped for the rest of the
+# run. Operation counters of the workers are not collected.
+
+import argparse
+import ipaddress
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import Listener, Client
+
+from field import INF
+from jacobian import jacobian_add
+from msm_pippenger import msm_pippenger
+
+AUTHKEY_ENV = "MSM_SHARD_AUTHKEY"
+
+
+class ShardError(RuntimeError):
+    """A shard could not be computed within its retries."""
+
+
+def _resolve_authkey(authkey):
+    """authkey (str / bytes), else $MSM_SHARD_AUTHKEY; there is no default."""
+    if authkey is None:
+        authkey = os.environ.get(AUTHKEY_ENV)
+    if isinstance(authkey, str):
+        authkey = authkey.encode()
+    if not authkey:
+        raise ValueError(f"an authkey is required (argument or ${AUTHKEY_ENV})")
+    return authkey
+
+
+def _is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+# ------------------------------------------------------------
+# Worker side
+# ------------------------------------------------------------
+#
+# Requests / replies are pickled tuples:
+#   ("msm", shard, scalars, points, w, signed)
+#       -> ("ok", shard, R, compute_s) | ("error", shard, message)
+#   ("ping",) -> ("pong", pid)
+#   ("shutdown",) -> ("bye",), then the worker exits
+
+def _serve_connection(conn, stop):
+    with conn:
+        while True:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                return
+
+            kind = request[0]
+            if kind == "msm":
+                _, shard, scalars, points, w, signed = request
+                start = time.perf_counter()
+                try:
+                    R = msm_pippenger(scalars, points, w, signed=signed)
+                except Exception as exc:
+                    conn.send(("error", shard, f"{type(exc).__name__}: {exc}"))
+                else:
+                    conn.send(("ok", shard, R, time.perf_counter() - start))
+            elif kind == "ping":
+                conn.send(("pong", os.getpid()))
+            elif kind == "shutdown":
+                conn.send(("bye",))
+                stop.set()
+                return
+            else:
+                conn.send(("error", None, f"unknown request: {kind}"))
+
+
+def serve_worker(listener):
+    """Answer MSM requests on `listener` until a shutdown request."""
+    stop = threading.Event()
+
+    def accept_loop():
+        while not stop.is_set():
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                # Closed listener, or a client failing authentication
+                if stop.is_set():
+                    return
+                continue
+            threading.Thread(
+                target=_serve_connection, args=(conn, stop), daemon=True
+            ).start()
+
+    threading.Thread(target=accept_loop, daemon=True).start()
+    stop.wait()
+    listener.close()
+
+
+def run_worker(host="127.0.0.1", port=0, authkey=None, ready=None):
+    """
+    Listen on (host, port) and serve. port=0 picks a free port;
+    the bound address is sent through `ready` (a Connection).
+    authkey (or $MSM_SHARD_AUTHKEY) is required; a non-loopback
+    host is refused without one passed explicitly.
+    """
+    if not _is_loopback(host) and not (authkey or os.environ.get(AUTHKEY_ENV)):
+        raise ValueError(f"refusing to listen on {host} without an authkey")
+    listener = Listener((host, port), authkey=_resolve_authkey(authkey))
+    if ready is not None:
+        ready.send(listener.address)
+        ready.close()
+    serve_worker(listener)
+
+
+# ------------------------------------------------------------
+# Local worker processes (tests / single host)
+# ------------------------------------------------------------
+
+class LocalWorkers:
+    """`count` worker processes listening on 127.0.0.1."""
+
+    def __init__(self, count, authkey=None):
+        self.authkey = authkey or os.urandom(16)
+        self.processes = []
+        self.addresses = []
+
+        for _ in range(count):
+            parent, child = multiprocessing.Pipe(duplex=False)
+            proc = multiprocessing.Process(
+                target=run_worker,
+                args=("127.0.0.1", 0, self.authkey, child),
+                daemon=True,
+            )
+            proc.start()
+            child.close()
+            self.processes.append(proc)
+            self.addresses.append(parent.recv())
+            parent.close()
+
+    def kill(self, idx):
+        """Terminate one worker (retry testing)."""
+        self.processes[idx].terminate()
+        self.processes[idx].join()
+
+    def stop(self):
+        for proc, address in zip(self.processes, self.addresses):
+            if not proc.is_alive():
+                continue
+            try:
+                with Client(address, authkey=self.authkey) as conn:
+                    conn.send(("shutdown",))
+                    conn.recv()
+            except (OSError, EOFError):
+                pass
+        for proc in self.processes:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def start_local_workers(count, authkey=None):
+    return LocalWorkers(count, authkey)
+
+
+# ------------------------------------------------------------
+# Coordinator
+# ------------------------------------------------------------
+
+def split_shards(count, shards):
+    """Contiguous [start, stop) ranges, sizes differing by at most 1."""
+    shards = max(1, min(shards, count))
+    size, extra = divmod(count, shards)
+    ranges = []
+    start = 0
+    for i in range(shards):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _worker_loop(address, authkey, timeout, tasks, results, state):
+    """
+    Coordinator thread for one worker: take shards from `tasks`
+    until none are left, or until this worker fails (its shard is
+    then queued again, or reported failed once out of retries).
+    """
+    conn = None
+    try:
+        while True:
+            with state["lock"]:
+                if state["remaining"] == 0:
+                    return
+            try:
+                task = tasks.get(timeout=0.05)
+            except queue.Empty:
+                continue
+
+            shard, start, stop, payload, attempts = task
+            sent = time.perf_counter()
+            try:
+                if conn is None:
+                    conn = Client(address, authkey=authkey)
+                conn.send(("msm", shard) + payload)
+                if not conn.poll(timeout):
+                    raise TimeoutError(f"no reply within {timeout} s")
+                reply = conn.recv()
+                if reply[0] != "ok":
+                    raise RuntimeError(reply[2])
+            except Exception as exc:
+                error = f"{address}: {type(exc).__name__}: {exc}"
+                with state["lock"]:
+                    state["errors"].append((shard, error))
+                    if attempts < state["retries"]:
+                        tasks.put((shard, start, stop, payload, attempts + 1))
+                    else:
+                        state["failed"] = ShardError(
+                            f"shard {shard} [{start}:{stop}] failed after "
+                            f"{attempts + 1} attempts: {error}"
+                        )
+                        state["remaining"] = 0
+                return
+
+            _, _, R, compute_s = reply
+            results[shard] = (R, {
+                "shard": shard,
+                "start": start,
+                "stop": stop,
+                "worker": address,
+                "attempts": attempts + 1,
+                "wall_s": time.perf_counter() - sent,
+                "compute_s": compute_s,
+            })
+            with state["lock"]:
+                state["remaining"] -= 1
+    finally:
+        if conn is not None:
+            conn.close()
+        with state["lock"]:
+            state["live"] -= 1
+
+
+def msm_sharded(scalars, points, workers, w=16, signed=False, shards=None,
+                retries=2, timeout=300.0, authkey=None, timings=None):
+    """
+    sum_i scalars[i] * points[i] as a Jacobian point, computed by the
+    workers at `workers` (addresses of run_worker listeners).
+
+    - shards=None uses one shard per worker
+    - a failed shard is retried up to `retries` more times, on any
+      worker still alive; ShardError once it runs out of attempts
+      or of workers
+    - timeout: seconds to wait for one shard's reply
+    - authkey: the workers' key (default $MSM_SHARD_AUTHKEY)
+    - timings: optional list, filled with one dict per shard
+      (shard, start, stop, worker, attempts, wall_s, compute_s)
+    """
+    scalars = list(scalars)
+    points = list(points)
+    if len(scalars) != len(points):
+        raise ValueError("scalars and points must have the same length")
+    if not workers:
+        raise ValueError("no workers")
+    authkey = _resolve_authkey(authkey)
+    if not scalars:
+        return INF
+
+    ranges = split_shards(len(scalars), shards or len(workers))
+
+    tasks = queue.Queue()
+    for shard, (start, stop) in enumerate(ranges):
+        payload = (scalars[start:stop], points[start:stop], w, signed)
+        tasks.put((shard, start, stop, payload, 0))
+
+    results = {}
+    state = {
+        "lock": threading.Lock(),
+        "remaining": len(ranges),
+        "live": len(workers),
+        "retries": retries,
+        "errors": [],
+        "failed": None,
+    }
+
+    threads = [
+        threading.Thread(
+            target=_worker_loop,
+            args=(address, authkey, timeout, tasks, results, state),
+            daemon=True,
+        )
+        for address in workers
+    ]
+    for t in threads:
+        t.start()
+
+    # Workers can all drop out with shards still queued
+    while any(t.is_alive() for t in threads):
+        for t in threads:
+            t.join(timeout=0.1)
+
+    if state["failed"] is not None:
+        raise state["failed"]
+    if len(results) != len(ranges):
+        missing = sorted(set(range(len(ranges))) - set(results))
+        raise ShardError(
+            f"no live workers left for shards {missing}; errors: {state['errors']}"
+        )
+
+    R = INF
+    for shard in range(len(ranges)):
+        partial, timing = results[shard]
+        R = jacobian_add(R, partial)
+        if timings is not None:
+            timings.append(timing)
+
+    return R
+
+
+def print_shard_timings(timings):
+    print(
+        f"\n{'Shard':>5} | {'Range':>17} | {'Worker':>21} | "
+        f"{'Tries':>5} | {'Wall s':>8} | {'Compute s':>9}"
+    )
+    print("-" * 80)
+    for t in timings:
+        worker = "%s:%s" % tuple(t["worker"])
+        print(
+            f"{t['shard']:>5} | {t['start']:>8}:{t['stop']:<8} | {worker:>21} | "
+            f"{t['attempts']:>5} | {t['wall_s']:>8.4f} | {t['compute_s']:>9.4f}"
+        )
+
+
+# ------------------------------------------------------------
+# Command line
+# ------------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded MSM")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    worker = sub.add_parser("worker", help="serve shards")
+    worker.add_argument("--host", default="127.0.0.1")
+    worker.add_argument("--port", type=int, default=6000)
+    worker.add_argument("--authkey", default=None,
+                        help=f"shared key (default ${AUTHKEY_ENV}; one of them is required)")
+
+    demo = sub.add_parser("demo", help="run one MSM on local workers")
+    demo.add_argument("--n", type=int, default=2000)
+    demo.add_argument("--w", type=int, default=8)
+    demo.add_argument("--workers", type=int, default=4)
+    demo.add_argument("--shards", type=int, default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        try:
+            authkey = _resolve_authkey(args.authkey)
+        except ValueError as exc:
+            parser.error(str(exc))
+        run_worker(args.host, args.port, authkey)
+        return 0
+
+    from fixtures import fixture
+    from jacobian import jacobian_to_affine
+
+    scalars, points = fixture(args.n)
+    timings = []
+    with start_local_workers(args.workers) as workers:
+        start = time.perf_counter()
+        R = msm_sharded(scalars, points, workers.addresses, w=args.w,
+                        shards=args.shards, authkey=workers.authkey, timings=timings)
+        elapsed = time.perf_counter() - start
+
+    print("Sharded MSM result:", jacobian_to_affine(R))
+    print(f"{len(timings)} shards on {args.workers} workers in {elapsed:.4f} s")
+    print_shard_timings(timings)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
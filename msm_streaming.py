@@ -0,0 +1,96 @@
+from itertools import islice
+
+from field import INF
+from jacobian import jacobian_add
+from msm_pippenger import (
+    split_scalar_windows,
+    split_scalar_windows_signed,
+    num_buckets_for,
+    build_buckets_pippenger,
+    reduce_buckets_pippenger,
+    shift_window,
+    msm_pippenger
+)
+
+
+# ------------------------------------------------------------
+# Read an iterable of (scalar, point) pairs in chunks
+# ------------------------------------------------------------
+
+def iter_chunks(pairs, chunk_size):
+    it = iter(pairs)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ------------------------------------------------------------
+# Streaming MSM (bounded memory)
+# ------------------------------------------------------------
+
+def msm_stream(pairs, w=16, bits=256, chunk_size=4096, signed=False,
+               partial_sums=False):
+    """
+    Multi-Scalar Multiplication over an iterable of (scalar, point)
+    pairs, consumed chunk_size pairs at a time.
+
+    Default: one bucket array per window stays live for the whole
+    stream and every chunk is accumulated into it; windows are
+    reduced once at the end. Peak memory:
+        ceil(bits / w) * #buckets points + one chunk
+    partial_sums=True runs msm_pippenger per chunk and adds the
+    partial results instead: one window's buckets + one chunk live,
+    at the price of a full reduction per chunk.
+
+    Scalars must fit in `bits` bits (the window count is fixed
+    before the stream is read).
+    """
+    if partial_sums:
+        R = INF
+        for chunk in iter_chunks(pairs, chunk_size):
+            scalars = [s for s, _ in chunk]
+            points = [P for _, P in chunk]
+            R = jacobian_add(R, msm_pippenger(scalars, points, w, signed))
+        return R
+
+    num_windows = (bits + w - 1) // w
+    if signed:
+        # Room for the final carry
+        num_windows += 1
+
+    split = split_scalar_windows_signed if signed else split_scalar_windows
+    num_buckets = num_buckets_for(w, signed)
+    window_buckets = [[INF] * num_buckets for _ in range(num_windows)]
+
+    for chunk in iter_chunks(pairs, chunk_size):
+        points = []
+        window_rows = [[] for _ in range(num_windows)]
+
+        for s, P in chunk:
+            if s.bit_length() > bits:
+                raise ValueError(f"scalar wider than {bits} bits")
+
+            ws = split(s, w)
+            for window_idx in range(num_windows):
+                if window_idx < len(ws):
+                    window_rows[window_idx].append(ws[window_idx])
+                else:
+                    window_rows[window_idx].append(0)
+            points.append(P)
+
+        for window_idx in range(num_windows):
+            build_buckets_pippenger(
+                window_rows[window_idx], points, w, signed,
+                buckets=window_buckets[window_idx],
+            )
+
+    # Reduce windows from MSB to LSB
+    R = INF
+    for window_idx in reversed(range(num_windows)):
+        if window_idx != num_windows - 1:
+            R = shift_window(R, w)
+        R = jacobian_add(R, reduce_buckets_pippenger(window_buckets[window_idx]))
+
+    return R
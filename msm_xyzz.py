@@ -0,0 +1,56 @@
+from xyzz import to_xyzz, xyzz_mixed_add, xyzz_add, xyzz_double_repeated, XYZZ_INF
+from msm_pippenger import num_buckets_for
+from glv import glv_preprocess
+from autotune import choose_window
+from scalar_digits import digit_matrix, bucket_groups, accumulate_groups
+
+
+def reduce_buckets_xyzz(buckets):
+    running = XYZZ_INF
+    result = XYZZ_INF
+
+    for i in range(len(buckets) - 1, 0, -1):
+        if buckets[i][2] != 0:
+            running = xyzz_add(running, buckets[i])
+
+        result = xyzz_add(result, running)
+
+    return result
+
+
+def shift_window_xyzz(R, w):
+    return xyzz_double_repeated(R, w)
+
+
+def msm_xyzz(scalars, points, w=16, signed=False, glv=False):
+    """
+    Pippenger MSM with buckets in XYZZ coordinates.
+    Result is returned as an XYZZ point (see xyzz_to_affine).
+    """
+    if glv:
+        scalars, points = glv_preprocess(scalars, points)
+
+    if w is None:
+        bits = max((s.bit_length() for s in scalars), default=0)
+        w = choose_window("xyzz", len(scalars), bits, signed)
+
+    # All window digits at once (num_windows x N)
+    digits = digit_matrix(scalars, w, signed)
+    max_windows = len(digits)
+    num_buckets = num_buckets_for(w, signed)
+
+    R = XYZZ_INF
+
+    for window_idx in reversed(range(max_windows)):
+        if window_idx != max_windows - 1:
+            R = shift_window_xyzz(R, w)
+
+        buckets = [XYZZ_INF] * num_buckets
+        for b, B in accumulate_groups(
+            bucket_groups(digits[window_idx]), points, to_xyzz, xyzz_mixed_add
+        ):
+            buckets[b] = B
+        bucket_sum = reduce_buckets_xyzz(buckets)
+        R = xyzz_add(R, bucket_sum)
+
+    return R
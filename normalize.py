@@ -0,0 +1,39 @@
+from field import f_mul, f_batch_inv, f_norm
+
+# form -> coordinates per point
+FORMS = {"jacobian": 3, "extended_jacobian": 4}
+
+
+# ------------------------------------------------------------
+# Projective -> affine for a whole list (one shared inversion)
+# ------------------------------------------------------------
+
+def batch_to_affine(points, form="jacobian"):
+    """
+    Affine (x, y) of every point, with a single f_batch_inv
+    (Montgomery's trick) instead of one inversion per point.
+
+    form = "jacobian" (X, Y, Z) or "extended_jacobian" (X, Y, Z, W);
+    both have x = X / Z^2, y = Y / Z^3. Points at infinity (Z == 0)
+    map to None, like jacobian_to_affine / extended_to_affine.
+    """
+    if form not in FORMS:
+        raise ValueError(f"unknown form: {form}")
+    coords = FORMS[form]
+
+    points = list(points)
+    finite = []
+    for k, P in enumerate(points):
+        if len(P) != coords:
+            raise ValueError(f"expected {coords} coordinates for {form}, got {len(P)}")
+        if P[2] != 0:
+            finite.append(k)
+
+    Z_invs = f_batch_inv([points[k][2] for k in finite])
+
+    affine = [None] * len(points)
+    for k, Z_inv in zip(finite, Z_invs):
+        X, Y = points[k][0], points[k][1]
+        Z_inv_sq = f_mul(Z_inv, Z_inv)
+        affine[k] = (f_norm(f_mul(X, Z_inv_sq)), f_norm(f_mul(Y, f_mul(Z_inv_sq, Z_inv))))
+    return affine
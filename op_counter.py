@@ -1,4 +1,13 @@
 # Global operation counters
+#
+# Only profiler.profile() increments these: the field and point
+# formulas carry no instrumentation, and profile() swaps in counting
+# wrappers for its duration. Work done outside a profile() leaves
+# them untouched, so print_counters() refuses to report unless a
+# profile() was active since the last reset_counters().
+
+counting = False   # profiler wrappers installed (set by profiler)
+profiled = False   # a profile() ran since the last reset_counters()
 
 jacobian_add_count = 0
 jacobian_mixed_add_count = 0
@@ -12,26 +21,57 @@ extended_mixed_add_count = 0
 extended_add_count = 0
 extended_double_count = 0
 
+batch_affine_add_count = 0
+
+xyzz_mixed_add_count = 0
+xyzz_add_count = 0
+xyzz_double_count = 0
+
+# Doublings done inside the m-fold *_double_repeated formulas
+jacobian_double_repeated_count = 0
+extended_double_repeated_count = 0
+xyzz_double_repeated_count = 0
+
 field_mul_count = 0
+field_inv_count = 0
 def reset_counters():
     global jacobian_add_count, jacobian_mixed_add_count, jacobian_double_count, affine_add_count
     global jacobian_double_count, affine_add_count
     global extended_mixed_add_count, extended_add_count, extended_double_count
+    global batch_affine_add_count
+    global xyzz_mixed_add_count, xyzz_add_count, xyzz_double_count
+    global jacobian_double_repeated_count, extended_double_repeated_count
+    global xyzz_double_repeated_count
 
-    global field_mul_count
+    global field_mul_count, field_inv_count
+    global profiled
 
+    profiled = counting
     jacobian_add_count = 0
     jacobian_mixed_add_count = 0
     jacobian_double_count = 0
     affine_add_count = 0
     extended_double_count = 0
     field_mul_count = 0
+    field_inv_count = 0
     extended_mixed_add_count = 0
     extended_add_count = 0
     extended_double_count = 0
+    batch_affine_add_count = 0
+    xyzz_mixed_add_count = 0
+    xyzz_add_count = 0
+    xyzz_double_count = 0
+    jacobian_double_repeated_count = 0
+    extended_double_repeated_count = 0
+    xyzz_double_repeated_count = 0
 
 
 def print_counters(title="Operation counts"):
+    if not profiled:
+        raise RuntimeError(
+            "no profiler.profile() since reset_counters(); "
+            "operations are only counted under the profiler"
+        )
     print(f"\n--- {title} ---")
     print("Jacobian add        :", jacobian_add_count)
     print("Jacobian mixed add  :", jacobian_mixed_add_count)
@@ -43,4 +83,16 @@ def print_counters(title="Operation counts"):
     print("Extended double     :", extended_double_count)
 
     print("Extended double     :", extended_double_count)
+
+    print("Batch affine add    :", batch_affine_add_count)
+
+    print("XYZZ mixed add      :", xyzz_mixed_add_count)
+    print("XYZZ add            :", xyzz_add_count)
+    print("XYZZ double         :", xyzz_double_count)
+
+    print("Jacobian dbl (rep.) :", jacobian_double_repeated_count)
+    print("Extended dbl (rep.) :", extended_double_repeated_count)
+    print("XYZZ dbl (rep.)     :", xyzz_double_repeated_count)
+
     print("Total Field Muls    :", field_mul_count)
+    print("Total Field Invs    :", field_inv_count)
@@ -0,0 +1,273 @@
+# ==========================================================
+#   Cycle-level model of the bucket-accumulation pipeline
+# ==========================================================
+#
+# Hardware model:
+#   - `units` mixed-add units, each fully pipelined with latency
+#     `depth` cycles (one new add per unit per cycle)
+#   - every bucket access is one add (buckets start at infinity,
+#     the adder handles it), result written back `depth` cycles
+#     after issue
+#   - an add cannot issue while an earlier add on the same bucket
+#     is still in flight (read-after-write hazard)
+#
+# Conflict policies:
+#   "stall"   : in-order issue; a conflicting access blocks the
+#               stream until its bucket is written back
+#   "fifo"    : a conflicting access is moved to a deferral FIFO of
+#               `queue` entries; the FIFO head is retried before new
+#               input. The stream stalls only when the FIFO is full
+#   "reorder" : up to `queue` pending accesses; each cycle the oldest
+#               ready ones issue, in any order
+#
+# The access stream is the one the engines walk: per window, the
+# buckets of scalar_digits.bucket_groups in increasing order, each
+# filled with all of its points back to back (order="grouped").
+# For comparison, the raw digits of digit_matrix point by point,
+# window by window (order="window"), or all windows of one point
+# before the next (order="point").
+
+import argparse
+import random
+from collections import deque
+
+from scalar_digits import digit_matrix, bucket_groups
+
+POLICIES = ("stall", "fifo", "reorder")
+
+
+# ------------------------------------------------------------
+# Access stream
+# ------------------------------------------------------------
+
+def bucket_access_stream(scalars, w, signed=False, order="grouped"):
+    """
+    Bucket keys (window, bucket) in issue order; zero digits
+    are skipped, negative digits hit bucket |d|.
+    """
+    digits = digit_matrix(scalars, w, signed)
+
+    if order == "grouped":
+        # accumulate_groups: one run of adds per occupied bucket
+        return [
+            (window_idx, b)
+            for window_idx, row in enumerate(digits)
+            for b, pos, neg in bucket_groups(row)
+            for _ in range(len(pos) + len(neg))
+        ]
+    if order == "window":
+        return [
+            (window_idx, abs(d))
+            for window_idx, row in enumerate(digits)
+            for d in row if d
+        ]
+    if order == "point":
+        return [
+            (window_idx, abs(row[idx]))
+            for idx in range(len(scalars))
+            for window_idx, row in enumerate(digits) if row[idx]
+        ]
+    raise ValueError(f"unknown order: {order}")
+
+
+# ------------------------------------------------------------
+# Simulator
+# ------------------------------------------------------------
+
+def simulate(stream, depth=8, units=1, policy="stall", queue=16):
+    """
+    Run the access stream through the pipeline model.
+    Returns a dict:
+        cycles          : cycle of the last write-back
+        ops             : adds issued (= len(stream))
+        ideal_cycles    : cycles with no hazards, ceil(ops/units) + depth - 1
+        stall_cycles    : cycles with pending work and nothing issued
+                          or deferred
+        deferral_cycles : "fifo" only, cycles that moved accesses
+                          to the FIFO but issued nothing
+        conflicts       : accesses that found their bucket in flight
+        utilization     : ops / (cycles * units)
+        max_queue       : peak FIFO / reorder-window occupancy
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"unknown policy: {policy}")
+    if depth < 1 or units < 1 or queue < 1:
+        raise ValueError("depth, units and queue must be >= 1")
+
+    n = len(stream)
+    busy = {}      # bucket -> cycle its in-flight add is written back
+    t = 0
+    i = 0
+    stall_cycles = 0
+    deferral_cycles = 0
+    conflicts = 0
+    max_queue = 0
+    last_done = 0
+
+    if policy == "stall":
+        blocked = None
+        while i < n:
+            issued = 0
+            while issued < units and i < n:
+                key = stream[i]
+                ready = busy.get(key, 0)
+                if ready > t:
+                    if blocked != i:
+                        conflicts += 1
+                        blocked = i
+                    break
+                busy[key] = t + depth
+                i += 1
+                issued += 1
+
+            if issued == 0:
+                # Nothing can issue before the head's bucket is free
+                stall_cycles += ready - t
+                t = ready
+                continue
+            last_done = t + depth
+            t += 1
+
+    elif policy == "fifo":
+        fifo = deque()
+        while i < n or fifo:
+            slots = 0
+            issued = 0
+            while slots < units:
+                if fifo and busy.get(fifo[0], 0) <= t:
+                    busy[fifo.popleft()] = t + depth
+                    issued += 1
+                elif i < n and busy.get(stream[i], 0) <= t:
+                    busy[stream[i]] = t + depth
+                    i += 1
+                    issued += 1
+                elif i < n and len(fifo) < queue:
+                    # Defer: the access uses this slot but does not issue
+                    fifo.append(stream[i])
+                    i += 1
+                    conflicts += 1
+                    max_queue = max(max_queue, len(fifo))
+                else:
+                    break
+                slots += 1
+
+            if issued:
+                last_done = t + depth
+            elif slots == 0:
+                # FIFO head blocked, and input blocked with the FIFO full
+                wait = busy[fifo[0]]
+                if i < n:
+                    wait = min(wait, busy[stream[i]])
+                stall_cycles += wait - t
+                t = wait
+                continue
+            else:
+                deferral_cycles += 1
+            t += 1
+
+    else:  # reorder
+        pending = []
+        seen = set()   # accesses already counted as conflicts
+        while i < n or pending:
+            # Intake: issue width per cycle
+            for _ in range(units):
+                if i >= n or len(pending) >= queue:
+                    break
+                pending.append((i, stream[i]))
+                i += 1
+            max_queue = max(max_queue, len(pending))
+
+            issued = 0
+            keep = []
+            for entry in pending:
+                idx, key = entry
+                if issued < units and busy.get(key, 0) <= t:
+                    busy[key] = t + depth
+                    issued += 1
+                else:
+                    if busy.get(key, 0) > t and idx not in seen:
+                        seen.add(idx)
+                        conflicts += 1
+                    keep.append(entry)
+            pending = keep
+
+            if issued:
+                last_done = t + depth
+                t += 1
+            elif len(pending) >= queue or i >= n:
+                # Window full (or input done) and nothing ready
+                wait = min(busy[key] for _, key in pending)
+                stall_cycles += wait - t
+                t = wait
+            else:
+                stall_cycles += 1
+                t += 1
+
+    ideal = (n + units - 1) // units + depth - 1 if n else 0
+    return {
+        "cycles": last_done,
+        "ops": n,
+        "ideal_cycles": ideal,
+        "stall_cycles": stall_cycles,
+        "deferral_cycles": deferral_cycles,
+        "conflicts": conflicts,
+        "utilization": n / (last_done * units) if last_done else 0.0,
+        "max_queue": max_queue,
+    }
+
+
+def simulate_msm(scalars, w, depth=8, units=1, policy="stall", queue=16,
+                 signed=False, order="grouped"):
+    """simulate() on the bucket accesses of one MSM."""
+    stream = bucket_access_stream(scalars, w, signed, order)
+    return simulate(stream, depth, units, policy, queue)
+
+
+# ------------------------------------------------------------
+# Sizing sweep
+# ------------------------------------------------------------
+
+def _int_list(text):
+    return [int(x) for x in text.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bucket pipeline simulator")
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--w", type=int, default=8)
+    parser.add_argument("--bits", type=int, default=256)
+    parser.add_argument("--signed", action="store_true")
+    parser.add_argument("--order", choices=("grouped", "window", "point"), default="grouped")
+    parser.add_argument("--depth", type=_int_list, default=[4, 8, 16])
+    parser.add_argument("--units", type=_int_list, default=[1, 2, 4])
+    parser.add_argument("--policy", default=",".join(POLICIES))
+    parser.add_argument("--queue", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    scalars = [rng.getrandbits(args.bits) for _ in range(args.n)]
+    stream = bucket_access_stream(scalars, args.w, args.signed, args.order)
+
+    print(f"\n{len(stream)} bucket adds  (N={args.n}, w={args.w}, bits={args.bits}, "
+          f"signed={args.signed}, order={args.order}, queue={args.queue})")
+    print(
+        f"{'Policy':<8} | {'Depth':>5} | {'Units':>5} | {'Cycles':>9} | "
+        f"{'Ideal':>9} | {'Stalls':>8} | {'Defers':>8} | {'Conflicts':>9} | "
+        f"{'Util':>6} | {'MaxQ':>4}"
+    )
+    print("-" * 97)
+
+    for policy in args.policy.split(","):
+        for depth in args.depth:
+            for units in args.units:
+                r = simulate(stream, depth, units, policy, args.queue)
+                print(
+                    f"{policy:<8} | {depth:>5} | {units:>5} | {r['cycles']:>9} | "
+                    f"{r['ideal_cycles']:>9} | {r['stall_cycles']:>8} | "
+                    f"{r['deferral_cycles']:>8} | {r['conflicts']:>9} | {r['utilization']:>6.1%} | {r['max_queue']:>4}"
+                )
+
+
+if __name__ == "__main__":
+    main()
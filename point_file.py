@@ -0,0 +1,192 @@
+# ==========================================================
+#   Binary point / scalar files (memory-mapped)
+# ==========================================================
+#
+# Layout (little-endian):
+#
+#   header, 32 bytes:
+#     magic    4s   b"MSMP" (points) or b"MSMS" (scalars)
+#     version  u16
+#     curve    u16  CURVES id
+#     form     u16  FORMS id (0 for scalar files)
+#     reserved u16
+#     count    u64
+#     padding  12 bytes
+#
+#   body: count records, each = coords * 32-byte little-endian ints
+#
+# PointFile / ScalarFile map the file and decode records on access,
+# so the MSM engines (which only index / iterate) can use them in
+# place of a list without materializing all tuples.
+
+import mmap
+import os
+import struct
+from abc import abstractmethod
+from collections.abc import Sequence
+
+POINT_MAGIC = b"MSMP"
+SCALAR_MAGIC = b"MSMS"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHHHQ12x")
+COORD_BYTES = 32
+
+CURVES = {"secp256k1": 1}
+
+# form name -> (id, coordinates per point)
+FORMS = {
+    "affine": (0, 2),
+    "jacobian": (1, 3),
+    "extended_jacobian": (2, 4),
+}
+
+
+def _name_of(table, ident):
+    for name, value in table.items():
+        if (value[0] if isinstance(value, tuple) else value) == ident:
+            return name
+    raise ValueError(f"unknown id {ident}")
+
+
+# ------------------------------------------------------------
+# Writers
+# ------------------------------------------------------------
+
+def _write(path, magic, curve, form_id, coords, records, count):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(magic, VERSION, CURVES[curve], form_id, 0, count))
+        for rec in records:
+            if len(rec) != coords:
+                raise ValueError(f"expected {coords} coordinates, got {len(rec)}")
+            f.write(b"".join(c.to_bytes(COORD_BYTES, "little") for c in rec))
+
+
+def write_points(path, points, form="affine", curve="secp256k1"):
+    """Write a list of points (tuples of `form`) to `path`."""
+    form_id, coords = FORMS[form]
+    points = list(points)
+    _write(path, POINT_MAGIC, curve, form_id, coords, points, len(points))
+
+
+def write_scalars(path, scalars, curve="secp256k1"):
+    """Write a list of scalars (< 2^256) to `path`."""
+    scalars = list(scalars)
+    _write(path, SCALAR_MAGIC, curve, 0, 1, ((s,) for s in scalars), len(scalars))
+
+
+# ------------------------------------------------------------
+# Memory-mapped readers
+# ------------------------------------------------------------
+
+class _MappedRecords(Sequence):
+    """
+    Base of the mmapped readers (collections.abc.Sequence is an ABC:
+    a subclass missing _setup / _decode cannot be instantiated).
+    The record count is len(); Sequence.count(value) keeps its
+    usual meaning.
+    """
+
+    _magic = None
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = None
+        try:
+            self._open(path)
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self, path):
+        if os.fstat(self._file.fileno()).st_size < HEADER.size:
+            raise ValueError(f"{path}: shorter than the {HEADER.size}-byte header")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, curve, form, _, count = HEADER.unpack_from(self._mm, 0)
+        if magic != self._magic:
+            raise ValueError(f"{path}: bad magic {magic!r}")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported version {version}")
+
+        self.curve = _name_of(CURVES, curve)
+        self._count = count
+        self._setup(form)
+        self._record = self.coords * COORD_BYTES
+
+        if len(self._mm) < HEADER.size + count * self._record:
+            raise ValueError(f"{path}: truncated file")
+
+    @abstractmethod
+    def _setup(self, form):
+        """Read the header's form id; set self.coords (and self.form)."""
+
+    @abstractmethod
+    def _decode(self, offset):
+        """Record at byte `offset` of the map."""
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._decode(HEADER.size + i * self._record)
+
+    def __iter__(self):
+        offset = HEADER.size
+        for _ in range(self._count):
+            yield self._decode(offset)
+            offset += self._record
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PointFile(_MappedRecords):
+    """Read-only sequence of points backed by an mmapped file."""
+
+    _magic = POINT_MAGIC
+
+    def _setup(self, form):
+        self.form = _name_of(FORMS, form)
+        self.coords = FORMS[self.form][1]
+
+    def _decode(self, offset):
+        mm = self._mm
+        return tuple(
+            int.from_bytes(mm[o:o + COORD_BYTES], "little")
+            for o in range(offset, offset + self._record, COORD_BYTES)
+        )
+
+
+class ScalarFile(_MappedRecords):
+    """Read-only sequence of scalars backed by an mmapped file."""
+
+    _magic = SCALAR_MAGIC
+
+    def _setup(self, form):
+        self.coords = 1
+
+    def _decode(self, offset):
+        return int.from_bytes(self._mm[offset:offset + COORD_BYTES], "little")
+
+
+def load_points(path):
+    return PointFile(path)
+
+
+def load_scalars(path):
+    return ScalarFile(path)
@@ -0,0 +1,284 @@
+# ==========================================================
+#   Phase profiler (operation counts + wall time per phase)
+# ==========================================================
+#
+# The field and point formulas carry no instrumentation. profile()
+# rebinds them, in every module that imported them (the same way
+# field.set_field_mode does), to wrappers that bump the op_counter
+# globals, and wraps the engine phases (digits, build, reduce,
+# shift, glv) to attribute time and counts to each phase.
+# Leaving the context restores the original functions, so a run
+# without profile() pays nothing and counts nothing: op_counter
+# totals are only meaningful for work done inside profile() (and
+# op_counter.print_counters checks that one ran).
+#
+#   with profile() as prof:
+#       msm_pippenger(scalars, points, w=8)
+#   prof.report("Pippenger")
+#
+# Pick the field mode (set_field_mode) before entering profile().
+
+import importlib
+import sys
+import time
+
+import op_counter
+
+COUNTERS = tuple(name for name in vars(op_counter) if name.endswith("_count"))
+
+
+def _lanes(args, out):
+    return args[0].shape[1]
+
+
+def _doublings(args, out):
+    return args[1]
+
+
+def _done(args, out):
+    return sum(r is not None for r in out)
+
+
+# (module, function, op_counter name, weight(args, result) or None = 1)
+COUNTED = [
+    ("field", "f_mul", "field_mul_count", None),
+    ("field", "f_inv", "field_inv_count", None),
+    ("field_numpy", "v_mul", "field_mul_count", _lanes),
+    ("field_numpy", "v_sqr", "field_mul_count", _lanes),
+    ("jacobian", "jacobian_double", "jacobian_double_count", None),
+    ("jacobian", "jacobian_double_repeated", "jacobian_double_repeated_count", _doublings),
+    ("jacobian", "jacobian_mixed_add", "jacobian_mixed_add_count", None),
+    ("jacobian", "jacobian_add", "jacobian_add_count", None),
+    ("extended_jacobian", "extended_double", "extended_double_count", None),
+    ("extended_jacobian", "extended_double_repeated", "extended_double_repeated_count", _doublings),
+    ("extended_jacobian", "extended_mixed_add", "extended_mixed_add_count", None),
+    ("extended_jacobian", "extended_add", "extended_add_count", None),
+    ("xyzz", "xyzz_double", "xyzz_double_count", None),
+    ("xyzz", "xyzz_double_repeated", "xyzz_double_repeated_count", _doublings),
+    ("xyzz", "xyzz_mixed_add", "xyzz_mixed_add_count", None),
+    ("xyzz", "xyzz_add", "xyzz_add_count", None),
+    ("msm_naive", "affine_add", "affine_add_count", None),
+    ("msm_batch_affine", "batch_affine_add_pairs", "batch_affine_add_count", _done),
+    ("msm_numpy", "v_jacobian_mixed_add", "jacobian_mixed_add_count", _lanes),
+    ("bucket_store", "BucketStore._jacobian_mixed_add", "jacobian_mixed_add_count", None),
+    ("bucket_store", "BucketStore._extended_mixed_add", "extended_mixed_add_count", None),
+]
+
+# (module, function, phase)
+PHASES = [
+    ("scalar_digits", "digit_matrix", "digits"),
+    ("scalar_digits", "bucket_groups", "build"),
+    ("scalar_digits", "accumulate_groups", "build"),
+    ("glv", "glv_preprocess", "glv"),
+    ("msm_reference", "reduce_buckets_reference", "reduce"),
+    ("msm_reference", "shift_window", "shift"),
+    ("msm_pippenger", "build_buckets_pippenger", "build"),
+    ("msm_pippenger", "reduce_buckets_pippenger", "reduce"),
+    ("msm_pippenger", "reduce_buckets_sparse", "reduce"),
+    ("msm_pippenger", "shift_window", "shift"),
+    ("msm_extended", "reduce_buckets_extended", "reduce"),
+    ("msm_extended", "shift_window_extended", "shift"),
+    ("msm_xyzz", "reduce_buckets_xyzz", "reduce"),
+    ("msm_xyzz", "shift_window_xyzz", "shift"),
+    ("msm_batch_affine", "build_buckets_batch_affine", "build"),
+    ("msm_batch_affine", "reduce_buckets_batch_affine", "reduce"),
+    ("bucket_store", "build_buckets_store", "build"),
+    ("bucket_store", "reduce_buckets_store", "reduce"),
+    ("msm_numpy", "build_buckets_numpy", "build"),
+    ("msm_batch", "build_buckets_batch", "build"),
+]
+
+_active = []    # Profile objects currently collecting
+_patched = []   # (owner, name, original) to restore on disable
+
+
+# ------------------------------------------------------------
+# Wrappers
+# ------------------------------------------------------------
+
+def _counted(fn, counter, weight):
+    counts = vars(op_counter)
+    # Compiled formulas (formulas.py) carry a twin that adds their
+    # static field-mul count (the f_mul calls the hand-written
+    # formula would make)
+    fn = getattr(fn, "counted", fn)
+
+    if weight is None:
+        def wrapper(*args):
+            counts[counter] += 1
+            return fn(*args)
+    else:
+        def wrapper(*args):
+            out = fn(*args)
+            counts[counter] += weight(args, out)
+            return out
+
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+
+def _phased(fn, phase):
+    def wrapper(*args, **kwargs):
+        for prof in _active:
+            prof._enter(phase)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            for prof in _active:
+                prof._leave()
+
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+
+# ------------------------------------------------------------
+# Patch / restore
+# ------------------------------------------------------------
+
+def _rebind(module, name, new):
+    """Point every module-level reference to module.name at `new`."""
+    old = getattr(module, name)
+    for mod in list(sys.modules.values()):
+        if getattr(mod, "__dict__", {}).get(name) is old:
+            _patched.append((mod, name, old))
+            setattr(mod, name, new)
+
+
+def _install(table, make):
+    for module_name, path, *extra in table:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:  # optional backend (e.g. NumPy) missing
+            continue
+
+        owner_name, _, name = path.rpartition(".")
+        if owner_name:
+            # Method: patch the class attribute
+            owner = getattr(module, owner_name)
+            old = owner.__dict__[name]
+            _patched.append((owner, name, old))
+            setattr(owner, name, make(old, *extra))
+        else:
+            _rebind(module, name, make(getattr(module, name), *extra))
+
+
+def _enable():
+    _install(COUNTED, _counted)
+    _install(PHASES, _phased)
+    op_counter.counting = op_counter.profiled = True
+
+
+def _disable():
+    while _patched:
+        owner, name, old = _patched.pop()
+        setattr(owner, name, old)
+    op_counter.counting = False
+
+
+def profiling_enabled():
+    return bool(_active)
+
+
+# ------------------------------------------------------------
+# Profile
+# ------------------------------------------------------------
+
+def _snapshot():
+    counts = vars(op_counter)
+    return [counts[name] for name in COUNTERS]
+
+
+class Profile:
+    """
+    Per-phase statistics of one profiled region:
+        phases[name] = {"time": seconds, "calls": n, <counter>: n, ...}
+    Work is charged to the innermost running phase; everything
+    outside a phase goes to "other".
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.elapsed = 0.0
+        self._stack = ["other"]
+        self._t = None
+        self._counts = None
+
+    def _stats(self, phase):
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = {"time": 0.0, "calls": 0}
+            stats.update(dict.fromkeys(COUNTERS, 0))
+        return stats
+
+    def _flush(self):
+        now = time.perf_counter()
+        counts = _snapshot()
+
+        stats = self._stats(self._stack[-1])
+        stats["time"] += now - self._t
+        for name, new, old in zip(COUNTERS, counts, self._counts):
+            stats[name] += new - old
+
+        self._t = now
+        self._counts = counts
+
+    def _enter(self, phase):
+        self._flush()
+        self._stack.append(phase)
+        self._stats(phase)["calls"] += 1
+
+    def _leave(self):
+        self._flush()
+        self._stack.pop()
+
+    def start(self):
+        if not _active:
+            _enable()
+        _active.append(self)
+        self._t = time.perf_counter()
+        self._counts = _snapshot()
+        self._start = self._t
+
+    def stop(self):
+        self._flush()
+        self.elapsed += self._t - self._start
+        _active.remove(self)
+        if not _active:
+            _disable()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def totals(self):
+        """Counters summed over all phases."""
+        return {
+            name: sum(stats[name] for stats in self.phases.values())
+            for name in COUNTERS
+        }
+
+    def report(self, title="Profile"):
+        print(f"\n--- {title} ({self.elapsed:.3f} s) ---")
+        print(
+            f"{'Phase':<8} | {'Calls':>7} | {'Time (s)':>9} | {'Share':>6} | "
+            f"{'Field muls':>11} | {'Point ops':>10} | {'Invs':>6}"
+        )
+        for phase, stats in sorted(self.phases.items(), key=lambda kv: -kv[1]["time"]):
+            point_ops = sum(
+                stats[name] for name in COUNTERS
+                if name not in ("field_mul_count", "field_inv_count")
+            )
+            share = stats["time"] / self.elapsed if self.elapsed else 0.0
+            print(
+                f"{phase:<8} | {stats['calls']:>7} | {stats['time']:>9.4f} | "
+                f"{share:>6.1%} | {stats['field_mul_count']:>11} | "
+                f"{point_ops:>10} | {stats['field_inv_count']:>6}"
+            )
+
+
+def profile():
+    """Context manager: profile the enclosed code (see module header)."""
+    return Profile()
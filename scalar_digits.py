@@ -0,0 +1,159 @@
+# ==========================================================
+#   Scalar preprocessing shared by the window-based MSMs
+#   - all window digits in one pass (digit matrix)
+#   - per-window grouping of point indices by bucket
+# ==========================================================
+from field import f_neg
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback below
+    np = None
+
+# Widest window the int64 NumPy path can hold (digit + carry)
+_NUMPY_MAX_W = 62
+
+
+# ------------------------------------------------------------
+# Digit matrix  (num_windows x N)
+# ------------------------------------------------------------
+
+def digit_matrix(scalars, w, signed=False):
+    """
+    rows[j][i] = digit j (LSB first) of scalars[i].
+
+    Unsigned digits are in [0, 2^w); signed digits in
+    [-2^(w-1)+1, 2^(w-1)] with the same carry rule as
+    split_scalar_windows_signed. The number of rows equals the
+    longest split_scalar_windows(_signed) over all scalars.
+    """
+    scalars = list(scalars)
+    if not scalars:
+        return []
+
+    bits = max(s.bit_length() for s in scalars)
+    num_windows = (bits + w - 1) // w
+    if num_windows == 0:
+        return []
+
+    if np is not None and w <= _NUMPY_MAX_W:
+        return _digit_matrix_numpy(scalars, w, signed, bits, num_windows)
+    return _digit_matrix_python(scalars, w, signed, num_windows)
+
+
+def _digit_matrix_numpy(scalars, w, signed, bits, num_windows):
+    n = len(scalars)
+    nbytes = (bits + 7) // 8
+
+    raw = np.frombuffer(
+        b"".join(s.to_bytes(nbytes, "little") for s in scalars), dtype=np.uint8
+    ).reshape(n, nbytes)
+
+    # Bit matrix, LSB first, padded to whole windows
+    bitmat = np.unpackbits(raw, axis=1, bitorder="little")
+    total = num_windows * w
+    if bitmat.shape[1] < total:
+        bitmat = np.pad(bitmat, ((0, 0), (0, total - bitmat.shape[1])))
+    bitmat = bitmat[:, :total].reshape(n, num_windows, w)
+
+    digits = np.zeros((num_windows, n), dtype=np.int64)
+    for k in range(w):
+        digits |= bitmat[:, :, k].T.astype(np.int64) << k
+
+    if signed:
+        half = 1 << (w - 1)
+        carry = np.zeros(n, dtype=np.int64)
+        for j in range(num_windows):
+            d = digits[j] + carry
+            carry = (d > half).astype(np.int64)
+            digits[j] = d - (carry << w)
+        if carry.any():
+            digits = np.vstack([digits, carry])
+
+    return digits.tolist()
+
+
+def _digit_matrix_python(scalars, w, signed, num_windows):
+    mask = (1 << w) - 1
+    rows = [
+        [(s >> (j * w)) & mask for s in scalars]
+        for j in range(num_windows)
+    ]
+
+    if signed:
+        half = 1 << (w - 1)
+        carry = [0] * len(scalars)
+        for row in rows:
+            for i, d in enumerate(row):
+                d += carry[i]
+                if d > half:
+                    row[i] = d - (1 << w)
+                    carry[i] = 1
+                else:
+                    row[i] = d
+                    carry[i] = 0
+        if any(carry):
+            rows.append(carry)
+
+    return rows
+
+
+# ------------------------------------------------------------
+# Group point indices by bucket (counting sort)
+# ------------------------------------------------------------
+
+def bucket_groups(row):
+    """
+    Occupied buckets of one window, in increasing bucket order:
+        [(b, indices with digit +b, indices with digit -b), ...]
+    """
+    if np is not None:
+        vals = np.asarray(row, dtype=np.int64)
+        mag = np.abs(vals)
+        counts = np.bincount(mag)
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        order = np.argsort(mag, kind="stable")
+        negative = vals < 0
+
+        groups = []
+        for b in (np.nonzero(counts[1:])[0] + 1).tolist():
+            idx = order[offsets[b]:offsets[b + 1]]
+            neg = negative[idx]
+            groups.append((b, idx[~neg].tolist(), idx[neg].tolist()))
+        return groups
+
+    pos = {}
+    neg = {}
+    for i, d in enumerate(row):
+        if d > 0:
+            pos.setdefault(d, []).append(i)
+        elif d < 0:
+            neg.setdefault(-d, []).append(i)
+
+    return [
+        (b, pos.get(b, []), neg.get(b, []))
+        for b in sorted(set(pos) | set(neg))
+    ]
+
+
+def accumulate_groups(groups, points, start, mixed_add):
+    """
+    Sum every group into one bucket value:
+        start(P_aff)      -> bucket holding a single point
+        mixed_add(B, P)   -> bucket + affine point
+    Returns [(b, bucket), ...].
+    """
+    out = []
+
+    for b, pos, neg in groups:
+        B = None
+        for idx in pos:
+            P_aff = points[idx]
+            B = start(P_aff) if B is None else mixed_add(B, P_aff)
+        for idx in neg:
+            x, y = points[idx]
+            P_aff = (x, f_neg(y))
+            B = start(P_aff) if B is None else mixed_add(B, P_aff)
+        out.append((b, B))
+
+    return out
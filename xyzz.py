@@ -0,0 +1,152 @@
+# ==========================================================
+#   XYZZ coordinates for secp256k1  (a = 0)
+# ==========================================================
+#
+#   (X, Y, ZZ, ZZZ)  ->  x = X / ZZ,  y = Y / ZZZ,  ZZ^3 = ZZZ^2
+#
+# ZZ and ZZZ are carried explicitly, so no formula has to rebuild
+# Z^2 or Z^3: mixed add 8M + 2S, add 12M + 2S, double 6M + 3S.
+# Formulas: madd-2008-s, add-2008-s, dbl-2008-s-1 (EFD).
+# ZZ == 0 is the point at infinity.
+
+from field import f_add, f_sub, f_mul, f_inv, f_neg, f_eq, f_norm, p
+from jacobian import double_steps
+
+XYZZ_INF = (1, 1, 0, 0)
+
+
+def to_xyzz(P_aff):
+    if P_aff is None: return XYZZ_INF
+    return (P_aff[0], P_aff[1], 1, 1)
+
+
+def xyzz_to_affine(P):
+    X, Y, ZZ, ZZZ = P
+    if ZZ == 0: return None
+    # One inversion of ZZ * ZZZ gives both 1/ZZ and 1/ZZZ
+    inv = f_inv(f_mul(ZZ, ZZZ))
+    return (f_norm(f_mul(X, f_mul(ZZZ, inv))), f_norm(f_mul(Y, f_mul(ZZ, inv))))
+
+
+def xyzz_neg(P):
+    X, Y, ZZ, ZZZ = P
+    return (X, f_neg(Y), ZZ, ZZZ)
+
+
+# ----------------------------------------------------------
+#  Doubling  (dbl-2008-s-1)
+# ----------------------------------------------------------
+
+def xyzz_double(P):
+    X1, Y1, ZZ1, ZZZ1 = P
+
+    if ZZ1 == 0 or f_eq(Y1, 0):
+        return XYZZ_INF
+
+    U = f_add(Y1, Y1)
+    V = f_mul(U, U)
+    W = f_mul(U, V)
+    S = f_mul(X1, V)
+
+    X1_sq = f_mul(X1, X1)
+    M = f_add(f_add(X1_sq, X1_sq), X1_sq)
+
+    X3 = f_sub(f_mul(M, M), f_add(S, S))
+    Y3 = f_sub(f_mul(M, f_sub(S, X3)), f_mul(W, Y1))
+    ZZ3 = f_mul(V, ZZ1)
+    ZZZ3 = f_mul(W, ZZZ1)
+
+    return (X3, Y3, ZZ3, ZZZ3)
+
+
+def xyzz_double_repeated(P, m):
+    """
+    2^m * P, same result as m xyzz_double calls.
+    X, Y go through jacobian.double_steps; ZZ and ZZZ are scaled
+    once by T^2 / T^3: 3M + 4S per doubling + 3M + 1S
+    (vs 6M + 3S per xyzz_double).
+    """
+    X1, Y1, ZZ1, ZZZ1 = P
+
+    if m == 0:
+        return P
+    if ZZ1 == 0:
+        return XYZZ_INF
+
+    X3, Y3, T = double_steps(X1, Y1, pow(2, m, p), m)
+
+    if f_eq(T, 0):
+        return XYZZ_INF
+
+    T_sq = f_mul(T, T)
+    ZZ3 = f_mul(ZZ1, T_sq)
+    ZZZ3 = f_mul(ZZZ1, f_mul(T_sq, T))
+
+    return (X3, Y3, ZZ3, ZZZ3)
+
+
+# ----------------------------------------------------------
+#  Mixed addition: XYZZ P + affine Q  (madd-2008-s)
+# ----------------------------------------------------------
+
+def xyzz_mixed_add(P, Q_aff):
+    X1, Y1, ZZ1, ZZZ1 = P
+    x2, y2 = Q_aff
+
+    if ZZ1 == 0:
+        return to_xyzz(Q_aff)
+
+    U2 = f_mul(x2, ZZ1)
+    S2 = f_mul(y2, ZZZ1)
+
+    if f_eq(U2, X1):
+        if not f_eq(S2, Y1):
+            return XYZZ_INF
+        return xyzz_double(P)
+
+    H = f_sub(U2, X1)
+    R = f_sub(S2, Y1)
+    PP = f_mul(H, H)
+    PPP = f_mul(H, PP)
+    Q = f_mul(X1, PP)
+
+    X3 = f_sub(f_sub(f_mul(R, R), PPP), f_add(Q, Q))
+    Y3 = f_sub(f_mul(R, f_sub(Q, X3)), f_mul(Y1, PPP))
+    ZZ3 = f_mul(ZZ1, PP)
+    ZZZ3 = f_mul(ZZZ1, PPP)
+
+    return (X3, Y3, ZZ3, ZZZ3)
+
+
+# ----------------------------------------------------------
+#  General addition  (add-2008-s)
+# ----------------------------------------------------------
+
+def xyzz_add(P, Q):
+    X1, Y1, ZZ1, ZZZ1 = P
+    X2, Y2, ZZ2, ZZZ2 = Q
+
+    if ZZ1 == 0: return Q
+    if ZZ2 == 0: return P
+
+    U1 = f_mul(X1, ZZ2)
+    U2 = f_mul(X2, ZZ1)
+    S1 = f_mul(Y1, ZZZ2)
+    S2 = f_mul(Y2, ZZZ1)
+
+    if f_eq(U1, U2):
+        if not f_eq(S1, S2): return XYZZ_INF
+        return xyzz_double(P)
+
+    H = f_sub(U2, U1)
+    R = f_sub(S2, S1)
+    PP = f_mul(H, H)
+    PPP = f_mul(H, PP)
+    Q = f_mul(U1, PP)
+
+    X3 = f_sub(f_sub(f_mul(R, R), PPP), f_add(Q, Q))
+    Y3 = f_sub(f_mul(R, f_sub(Q, X3)), f_mul(S1, PPP))
+    ZZ3 = f_mul(f_mul(ZZ1, ZZ2), PP)
+    ZZZ3 = f_mul(f_mul(ZZZ1, ZZZ2), PPP)
+
+    return (X3, Y3, ZZ3, ZZZ3)